@@ -1,5 +1,6 @@
 from flask import Flask, render_template, jsonify, request
 from google.cloud import bigquery
+from google.cloud.bigquery import QueryJobConfig, ScalarQueryParameter
 import pandas as pd
 import json
 import plotly.express as px
@@ -7,6 +8,7 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import os
 from datetime import datetime, timedelta
+from typing import Final
 
 app = Flask(__name__)
 # Helpers
@@ -41,6 +43,257 @@ except Exception as e:
     print(f"❌ Failed to connect to BigQuery: {e}")
     client = None
 
+# Queries are built once at import; per-request values are bound as query parameters
+# so the SQL text stays identical across requests and can hit the query cache
+Q_INCIDENTS: Final[str] = f"""
+SELECT
+    incident_id,
+    title,
+    description,
+    severity,
+    status,
+    created_at,
+    assigned_to,
+    category,
+    root_cause,
+    resolution,
+    resolution_time_hours,
+    affected_users,
+    affected_systems,
+    tags,
+    business_impact,
+    risk_score
+FROM `{PROJECT_ID}.si2a_gold.incidents`
+ORDER BY created_at DESC
+LIMIT 100
+"""
+
+Q_METRICS: Final[str] = f"""
+SELECT
+    severity,
+    COUNT(*) as count,
+    AVG(resolution_time_hours) as avg_resolution_time,
+    AVG(risk_score) as avg_risk_score,
+    SUM(affected_users) as total_affected_users
+FROM `{PROJECT_ID}.si2a_gold.incidents`
+GROUP BY severity
+ORDER BY
+    CASE severity
+        WHEN 'critical' THEN 1
+        WHEN 'high' THEN 2
+        WHEN 'medium' THEN 3
+        WHEN 'low' THEN 4
+        ELSE 5
+    END
+"""
+
+Q_INCIDENT_DETAIL: Final[str] = f"""
+SELECT
+    incident_id,
+    title,
+    description,
+    severity,
+    status,
+    business_impact,
+    resolution_time_hours,
+    affected_users,
+    risk_score,
+    category,
+    created_at,
+    root_cause,
+    resolution,
+    tags
+FROM `{PROJECT_ID}.si2a_gold.incidents`
+WHERE incident_id = @iid
+"""
+
+Q_SIMILAR_INCIDENTS: Final[str] = f"""
+DECLARE top_k INT64 DEFAULT 5;
+WITH q AS (
+  SELECT ML.GENERATE_EMBEDDING(MODEL `bqml.textembedding.gecko@001`, @qtxt) AS emb
+),
+inc AS (
+  SELECT
+    incident_id,
+    title,
+    description,
+    severity,
+    IFNULL(risk_score, 0.0) AS risk_score,
+    ML.GENERATE_EMBEDDING(
+      MODEL `bqml.textembedding.gecko@001`,
+      CONCAT(COALESCE(title,''), '\\n', COALESCE(description,''), '\\n', COALESCE(category,''), '\\n', COALESCE(root_cause,''))
+    ) AS emb
+  FROM `{PROJECT_ID}.si2a_gold.incidents`
+)
+SELECT
+  inc.incident_id,
+  inc.title,
+  inc.description,
+  inc.severity,
+  inc.risk_score,
+  1.0 - VECTOR_DISTANCE(inc.emb, (SELECT emb FROM q), 'COSINE') AS similarity_score
+FROM inc
+ORDER BY similarity_score DESC
+LIMIT top_k;
+"""
+
+Q_SIMILAR_KEYWORD: Final[str] = f"""
+SELECT
+    incident_id,
+    title,
+    description,
+    severity,
+    risk_score,
+    CASE
+        WHEN LOWER(title) LIKE @pattern OR
+             LOWER(description) LIKE @pattern THEN 0.9
+        ELSE 0.3
+    END AS similarity_score
+FROM `{PROJECT_ID}.si2a_gold.incidents`
+WHERE LOWER(title) LIKE @pattern
+   OR LOWER(description) LIKE @pattern
+ORDER BY similarity_score DESC
+LIMIT 5
+"""
+
+Q_POLICY_MATCH: Final[str] = f"""
+WITH q AS (
+  SELECT ML.GENERATE_EMBEDDING(MODEL `bqml.textembedding.gecko@001`, @qtxt) AS emb
+),
+pol AS (
+  SELECT
+    section_id,
+    section_title,
+    section_text,
+    ML.GENERATE_EMBEDDING(MODEL `bqml.textembedding.gecko@001`, COALESCE(section_text,'')) AS emb
+  FROM `{PROJECT_ID}.si2a_dim.policy_sections`
+)
+SELECT
+  section_id,
+  section_title,
+  section_text,
+  1.0 - VECTOR_DISTANCE(pol.emb, (SELECT emb FROM q), 'COSINE') AS similarity_score
+FROM pol
+ORDER BY similarity_score DESC
+LIMIT 5;
+"""
+
+Q_PLAYBOOK: Final[str] = f"""
+SELECT * FROM AI.GENERATE_TABLE(
+  'vertex-ai',
+  '''
+  You are an experienced incident responder. From the provided incident context,
+  produce a concise remediation plan with columns:
+  step STRING, owner STRING, eta_hours INT64, priority STRING, tooling STRING.
+  Constraints:
+  - 5 to 7 steps maximum
+  - owner are role names (e.g., IR Lead, IAM Admin, SecOps)
+  - priority is one of [P1, P2, P3]
+  - tooling references internal/common tools (e.g., SIEM, EDR, IAM, DLP)
+  Keep steps atomic and outcome‑oriented.
+  ''',
+  (
+    SELECT AS STRUCT
+      incident_id, title, description, severity, status, category, tags,
+      root_cause, resolution, business_impact, affected_users, risk_score
+    FROM `{PROJECT_ID}.si2a_gold.incidents`
+    WHERE incident_id = @iid
+  )
+);
+"""
+
+Q_PLAYBOOK_CONTEXT: Final[str] = f"""
+SELECT severity, category, COALESCE(tags, []) AS tags
+FROM `{PROJECT_ID}.si2a_gold.incidents` WHERE incident_id = @iid
+"""
+
+Q_TRENDS: Final[str] = f"""
+SELECT
+    DATE(created_at) as date,
+    COUNT(*) as incident_count,
+    AVG(risk_score) as avg_risk_score,
+    AVG(resolution_time_hours) as avg_resolution_time
+FROM `{PROJECT_ID}.si2a_gold.incidents`
+WHERE created_at >= TIMESTAMP(@start_date)
+GROUP BY DATE(created_at)
+ORDER BY date
+"""
+
+Q_DAILY_COUNTS: Final[str] = f"""
+SELECT
+    DATE(created_at) AS date,
+    COUNT(*) AS incident_count
+FROM `{PROJECT_ID}.si2a_gold.incidents`
+WHERE created_at >= TIMESTAMP(@start_date)
+GROUP BY date
+ORDER BY date
+"""
+
+Q_EVIDENCE: Final[str] = f"""
+SELECT evidence_id, incident_id, object_uri, object_type, description, tags, uploader, created_at
+FROM `{PROJECT_ID}.si2a_evidence.object_references`
+WHERE incident_id = @iid
+ORDER BY created_at DESC
+LIMIT 100
+"""
+
+Q_COMPLIANCE: Final[str] = f"""
+SELECT
+    i.incident_id,
+    i.title,
+    i.description,
+    i.severity,
+    i.tags,
+    CASE
+        WHEN 'mfa' IN UNNEST(i.tags) OR LOWER(i.description) LIKE '%mfa%' THEN 'MFA Policy'
+        WHEN 'saas' IN UNNEST(i.tags) OR LOWER(i.description) LIKE '%saas%' THEN 'SaaS Usage Policy'
+        WHEN 'access' IN UNNEST(i.tags) OR LOWER(i.description) LIKE '%access%' THEN 'Access Control Policy'
+        ELSE 'General Security Policy'
+    END AS applicable_policy,
+    CASE
+        WHEN i.severity = 'critical' THEN 'High Risk - Immediate Action Required'
+        WHEN i.severity = 'high' THEN 'High Risk - Escalate to Senior Team'
+        WHEN i.severity = 'medium' THEN 'Medium Risk - Standard Response'
+        WHEN i.severity = 'low' THEN 'Low Risk - Monitor and Document'
+        ELSE 'Minimal Risk - Routine Handling'
+    END AS compliance_assessment
+FROM `{PROJECT_ID}.si2a_gold.incidents` i
+WHERE i.incident_id = @iid
+"""
+
+Q_SEVERITY_CHART: Final[str] = f"""
+SELECT
+    severity,
+    COUNT(*) as count,
+    AVG(resolution_time_hours) as avg_resolution_time
+FROM `{PROJECT_ID}.si2a_gold.incidents`
+GROUP BY severity
+ORDER BY
+    CASE severity
+        WHEN 'critical' THEN 1
+        WHEN 'high' THEN 2
+        WHEN 'medium' THEN 3
+        WHEN 'low' THEN 4
+        ELSE 5
+    END
+"""
+
+Q_RISK_CHART: Final[str] = f"""
+SELECT
+    risk_category,
+    COUNT(*) as count
+FROM `{PROJECT_ID}.si2a_gold.incidents`
+GROUP BY risk_category
+ORDER BY risk_category
+"""
+
+# Query parameter helpers
+def incident_job_config(incident_id: str) -> QueryJobConfig:
+    return QueryJobConfig(query_parameters=[ScalarQueryParameter('iid', 'STRING', incident_id)])
+
+def start_date_job_config(start_date: datetime) -> QueryJobConfig:
+    return QueryJobConfig(query_parameters=[ScalarQueryParameter('start_date', 'DATE', start_date.date())])
+
 # RBAC helpers
 def get_user_role(req: request) -> str:
     role = (req.headers.get('X-User-Role') or req.cookies.get('user_role') or req.args.get('role') or 'viewer').strip().lower()
@@ -96,30 +349,7 @@ def get_incidents():
         return jsonify({'error': 'BigQuery client not available'}), 500
     
     try:
-        query = f"""
-        SELECT 
-            incident_id,
-            title,
-            description,
-            severity,
-            status,
-            created_at,
-            assigned_to,
-            category,
-            root_cause,
-            resolution,
-            resolution_time_hours,
-            affected_users,
-            affected_systems,
-            tags,
-            business_impact,
-            risk_score
-        FROM `{PROJECT_ID}.si2a_gold.incidents`
-        ORDER BY created_at DESC
-        LIMIT 100
-        """
-        
-        df = client.query(query).to_dataframe()
+        df = client.query(Q_INCIDENTS).to_dataframe()
         
         return jsonify(df_to_json_records(df))
     except Exception as e:
@@ -132,26 +362,7 @@ def get_metrics():
         return jsonify({'error': 'BigQuery client not available'}), 500
     
     try:
-        query = f"""
-        SELECT 
-            severity,
-            COUNT(*) as count,
-            AVG(resolution_time_hours) as avg_resolution_time,
-            AVG(risk_score) as avg_risk_score,
-            SUM(affected_users) as total_affected_users
-        FROM `{PROJECT_ID}.si2a_gold.incidents`
-        GROUP BY severity
-        ORDER BY 
-            CASE severity 
-                WHEN 'critical' THEN 1 
-                WHEN 'high' THEN 2 
-                WHEN 'medium' THEN 3 
-                WHEN 'low' THEN 4 
-                ELSE 5 
-            END
-        """
-        
-        df = client.query(query).to_dataframe()
+        df = client.query(Q_METRICS).to_dataframe()
         
         # Calculate additional metrics
         total_incidents = df['count'].sum()
@@ -177,27 +388,7 @@ def generate_ai_summary(incident_id):
     
     try:
         # Fetch incident details
-        query = f"""
-        SELECT 
-            incident_id,
-            title,
-            description,
-            severity,
-            status,
-            business_impact,
-            resolution_time_hours,
-            affected_users,
-            risk_score,
-            category,
-            created_at,
-            root_cause,
-            resolution,
-            tags
-        FROM `{PROJECT_ID}.si2a_gold.incidents`
-        WHERE incident_id = '{incident_id}'
-        """
-
-        df = client.query(query).to_dataframe()
+        df = client.query(Q_INCIDENT_DETAIL, job_config=incident_job_config(incident_id)).to_dataframe()
 
         if df.empty:
             return jsonify({'error': 'Incident not found'}), 404
@@ -316,39 +507,8 @@ def find_similar_incidents():
     
     try:
         # Semantic approach: embed query and incidents, compute cosine distance
-        sql = f"""
-        DECLARE top_k INT64 DEFAULT 5;
-        WITH q AS (
-          SELECT ML.GENERATE_EMBEDDING(MODEL `bqml.textembedding.gecko@001`, @qtxt) AS emb
-        ),
-        inc AS (
-          SELECT 
-            incident_id,
-            title,
-            description,
-            severity,
-            IFNULL(risk_score, 0.0) AS risk_score,
-            ML.GENERATE_EMBEDDING(
-              MODEL `bqml.textembedding.gecko@001`,
-              CONCAT(COALESCE(title,''), '\\n', COALESCE(description,''), '\\n', COALESCE(category,''), '\\n', COALESCE(root_cause,''))
-            ) AS emb
-          FROM `{PROJECT_ID}.si2a_gold.incidents`
-        )
-        SELECT 
-          inc.incident_id,
-          inc.title,
-          inc.description,
-          inc.severity,
-          inc.risk_score,
-          1.0 - VECTOR_DISTANCE(inc.emb, (SELECT emb FROM q), 'COSINE') AS similarity_score
-        FROM inc
-        ORDER BY similarity_score DESC
-        LIMIT top_k;
-        """
-
-        from google.cloud.bigquery import QueryJobConfig, ScalarQueryParameter
         job = client.query(
-            sql,
+            Q_SIMILAR_INCIDENTS,
             job_config=QueryJobConfig(query_parameters=[ScalarQueryParameter('qtxt', 'STRING', query_text)])
         )
         df = job.to_dataframe()
@@ -363,25 +523,10 @@ def find_similar_incidents():
     except Exception as e:
         # Fallback: keyword search
         try:
-            query = f"""
-            SELECT 
-                incident_id,
-                title,
-                description,
-                severity,
-                risk_score,
-                CASE 
-                    WHEN LOWER(title) LIKE '%{query_text.lower()}%' OR 
-                         LOWER(description) LIKE '%{query_text.lower()}%' THEN 0.9
-                    ELSE 0.3
-                END AS similarity_score
-            FROM `{PROJECT_ID}.si2a_gold.incidents`
-            WHERE LOWER(title) LIKE '%{query_text.lower()}%' 
-               OR LOWER(description) LIKE '%{query_text.lower()}%'
-            ORDER BY similarity_score DESC
-            LIMIT 5
-            """
-            df = client.query(query).to_dataframe()
+            df = client.query(
+                Q_SIMILAR_KEYWORD,
+                job_config=QueryJobConfig(query_parameters=[ScalarQueryParameter('pattern', 'STRING', f"%{query_text.lower()}%")])
+            ).to_dataframe()
             return jsonify({'query': query_text, 'results': df.to_dict('records'), 'fallback': True})
         except Exception as ex:
             return jsonify({'error': str(ex)}), 500
@@ -395,30 +540,8 @@ def policy_match():
     if not query_text:
         return jsonify({'error': 'Query text is required'}), 400
     try:
-        sql = f"""
-        WITH q AS (
-          SELECT ML.GENERATE_EMBEDDING(MODEL `bqml.textembedding.gecko@001`, @qtxt) AS emb
-        ),
-        pol AS (
-          SELECT 
-            section_id,
-            section_title,
-            section_text,
-            ML.GENERATE_EMBEDDING(MODEL `bqml.textembedding.gecko@001`, COALESCE(section_text,'')) AS emb
-          FROM `{PROJECT_ID}.si2a_dim.policy_sections`
-        )
-        SELECT 
-          section_id,
-          section_title,
-          section_text,
-          1.0 - VECTOR_DISTANCE(pol.emb, (SELECT emb FROM q), 'COSINE') AS similarity_score
-        FROM pol
-        ORDER BY similarity_score DESC
-        LIMIT 5;
-        """
-        from google.cloud.bigquery import QueryJobConfig, ScalarQueryParameter
         job = client.query(
-            sql,
+            Q_POLICY_MATCH,
             job_config=QueryJobConfig(query_parameters=[ScalarQueryParameter('qtxt', 'STRING', query_text)])
         )
         df = job.to_dataframe()
@@ -436,34 +559,7 @@ def generate_playbook(incident_id):
         return jsonify({'error': 'BigQuery client not available'}), 500
 
     try:
-        sql = f"""
-        SELECT * FROM AI.GENERATE_TABLE(
-          'vertex-ai',
-          '''
-          You are an experienced incident responder. From the provided incident context,
-          produce a concise remediation plan with columns:
-          step STRING, owner STRING, eta_hours INT64, priority STRING, tooling STRING.
-          Constraints:
-          - 5 to 7 steps maximum
-          - owner are role names (e.g., IR Lead, IAM Admin, SecOps)
-          - priority is one of [P1, P2, P3]
-          - tooling references internal/common tools (e.g., SIEM, EDR, IAM, DLP)
-          Keep steps atomic and outcome‑oriented.
-          ''',
-          (
-            SELECT AS STRUCT
-              incident_id, title, description, severity, status, category, tags,
-              root_cause, resolution, business_impact, affected_users, risk_score
-            FROM `{PROJECT_ID}.si2a_gold.incidents`
-            WHERE incident_id = @iid
-          )
-        );
-        """
-        from google.cloud.bigquery import QueryJobConfig, ScalarQueryParameter
-        job = client.query(
-            sql,
-            job_config=QueryJobConfig(query_parameters=[ScalarQueryParameter('iid', 'STRING', incident_id)])
-        )
+        job = client.query(Q_PLAYBOOK, job_config=incident_job_config(incident_id))
         df = job.to_dataframe()
         if df.empty:
             raise RuntimeError('Empty playbook from AI')
@@ -477,12 +573,7 @@ def generate_playbook(incident_id):
     except Exception:
         # Fallback template
         try:
-            info = client.query(
-                f"""
-                SELECT severity, category, COALESCE(tags, []) AS tags
-                FROM `{PROJECT_ID}.si2a_gold.incidents` WHERE incident_id = '{incident_id}'
-                """
-            ).to_dataframe()
+            info = client.query(Q_PLAYBOOK_CONTEXT, job_config=incident_job_config(incident_id)).to_dataframe()
             sev = (info.iloc[0]['severity'] if not info.empty else 'medium') if 'severity' in info.columns else 'medium'
             category = (info.iloc[0]['category'] if not info.empty else 'general') if 'category' in info.columns else 'general'
         except Exception:
@@ -516,19 +607,7 @@ def get_trends():
         end_date = datetime.now()
         start_date = end_date - timedelta(days=30)
         
-        query = f"""
-        SELECT 
-            DATE(created_at) as date,
-            COUNT(*) as incident_count,
-            AVG(risk_score) as avg_risk_score,
-            AVG(resolution_time_hours) as avg_resolution_time
-        FROM `{PROJECT_ID}.si2a_gold.incidents`
-        WHERE created_at >= TIMESTAMP('{start_date.strftime('%Y-%m-%d')}')
-        GROUP BY DATE(created_at)
-        ORDER BY date
-        """
-        
-        df = client.query(query).to_dataframe()
+        df = client.query(Q_TRENDS, job_config=start_date_job_config(start_date)).to_dataframe()
         
         if df.empty:
             # Return mock data if no real data
@@ -557,16 +636,7 @@ def anomalies_incidents():
     try:
         end_date = datetime.now()
         start_date = end_date - timedelta(days=60)
-        query = f"""
-        SELECT 
-            DATE(created_at) AS date,
-            COUNT(*) AS incident_count
-        FROM `{PROJECT_ID}.si2a_gold.incidents`
-        WHERE created_at >= TIMESTAMP('{start_date.strftime('%Y-%m-%d')}')
-        GROUP BY date
-        ORDER BY date
-        """
-        df = client.query(query).to_dataframe()
+        df = client.query(Q_DAILY_COUNTS, job_config=start_date_job_config(start_date)).to_dataframe()
         if df.empty:
             return jsonify({'series': [], 'anomalies': []})
         # Fill missing dates
@@ -598,16 +668,7 @@ def forecast_incidents():
         horizon_days = max(1, min(horizon_days, 60))
         end_date = datetime.now()
         start_date = end_date - timedelta(days=60)
-        query = f"""
-        SELECT 
-            DATE(created_at) AS date,
-            COUNT(*) AS incident_count
-        FROM `{PROJECT_ID}.si2a_gold.incidents`
-        WHERE created_at >= TIMESTAMP('{start_date.strftime('%Y-%m-%d')}')
-        GROUP BY date
-        ORDER BY date
-        """
-        df = client.query(query).to_dataframe()
+        df = client.query(Q_DAILY_COUNTS, job_config=start_date_job_config(start_date)).to_dataframe()
         if df.empty:
             # simple flat forecast
             base = 5
@@ -660,15 +721,7 @@ def evidence_endpoint(incident_id):
     table_fqn = f"{PROJECT_ID}.si2a_evidence.object_references"
     try:
         if request.method == 'GET':
-            query = f"""
-            SELECT evidence_id, incident_id, object_uri, object_type, description, tags, uploader, created_at
-            FROM `{table_fqn}`
-            WHERE incident_id = @iid
-            ORDER BY created_at DESC
-            LIMIT 100
-            """
-            from google.cloud.bigquery import QueryJobConfig, ScalarQueryParameter
-            job = client.query(query, job_config=QueryJobConfig(query_parameters=[ScalarQueryParameter('iid', 'STRING', incident_id)]))
+            job = client.query(Q_EVIDENCE, job_config=incident_job_config(incident_id))
             df = job.to_dataframe()
             return jsonify({'incident_id': incident_id, 'evidence': df_to_json_records(df)})
         else:
@@ -749,31 +802,7 @@ def check_compliance(incident_id):
         return jsonify({'error': 'BigQuery client not available'}), 500
     
     try:
-        query = f"""
-        SELECT 
-            i.incident_id,
-            i.title,
-            i.description,
-            i.severity,
-            i.tags,
-            CASE 
-                WHEN 'mfa' IN UNNEST(i.tags) OR LOWER(i.description) LIKE '%mfa%' THEN 'MFA Policy'
-                WHEN 'saas' IN UNNEST(i.tags) OR LOWER(i.description) LIKE '%saas%' THEN 'SaaS Usage Policy'
-                WHEN 'access' IN UNNEST(i.tags) OR LOWER(i.description) LIKE '%access%' THEN 'Access Control Policy'
-                ELSE 'General Security Policy'
-            END AS applicable_policy,
-            CASE 
-                WHEN i.severity = 'critical' THEN 'High Risk - Immediate Action Required'
-                WHEN i.severity = 'high' THEN 'High Risk - Escalate to Senior Team'
-                WHEN i.severity = 'medium' THEN 'Medium Risk - Standard Response'
-                WHEN i.severity = 'low' THEN 'Low Risk - Monitor and Document'
-                ELSE 'Minimal Risk - Routine Handling'
-            END AS compliance_assessment
-        FROM `{PROJECT_ID}.si2a_gold.incidents` i
-        WHERE i.incident_id = '{incident_id}'
-        """
-        
-        df = client.query(query).to_dataframe()
+        df = client.query(Q_COMPLIANCE, job_config=incident_job_config(incident_id)).to_dataframe()
         
         if df.empty:
             return jsonify({'error': 'Incident not found'}), 404
@@ -798,24 +827,7 @@ def get_severity_chart():
         return jsonify({'error': 'BigQuery client not available'}), 500
     
     try:
-        query = f"""
-        SELECT 
-            severity,
-            COUNT(*) as count,
-            AVG(resolution_time_hours) as avg_resolution_time
-        FROM `{PROJECT_ID}.si2a_gold.incidents`
-        GROUP BY severity
-        ORDER BY 
-            CASE severity 
-                WHEN 'critical' THEN 1 
-                WHEN 'high' THEN 2 
-                WHEN 'medium' THEN 3 
-                WHEN 'low' THEN 4 
-                ELSE 5 
-            END
-        """
-        
-        df = client.query(query).to_dataframe()
+        df = client.query(Q_SEVERITY_CHART).to_dataframe()
         
         if df.empty:
             # Return mock data
@@ -840,22 +852,7 @@ def get_risk_chart():
         return jsonify({'error': 'BigQuery client not available'}), 500
     
     try:
-        query = f"""
-        SELECT 
-            CASE 
-                WHEN risk_score >= 0.8 THEN 'Critical (0.8-1.0)'
-                WHEN risk_score >= 0.6 THEN 'High (0.6-0.79)'
-                WHEN risk_score >= 0.4 THEN 'Medium (0.4-0.59)'
-                WHEN risk_score >= 0.2 THEN 'Low (0.2-0.39)'
-                ELSE 'Minimal (0.0-0.19)'
-            END AS risk_category,
-            COUNT(*) as count
-        FROM `{PROJECT_ID}.si2a_gold.incidents`
-        GROUP BY risk_category
-        ORDER BY risk_category
-        """
-        
-        df = client.query(query).to_dataframe()
+        df = client.query(Q_RISK_CHART).to_dataframe()
         
         if df.empty:
             # Return mock data
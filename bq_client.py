@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Shared BigQuery client for SI²A scripts.
+Clients are cached per project so ADC discovery and HTTP session setup happen once per process.
+"""
+
+from functools import lru_cache
+
+import google.auth
+from google.auth.transport.requests import AuthorizedSession
+from google.cloud import bigquery
+from requests.adapters import HTTPAdapter
+
+HTTP_POOL_SIZE = 16
+# Results with fewer rows are paged over REST; a Storage Read API session only pays
+# for its setup on larger downloads
+STORAGE_API_MIN_ROWS = 1_000
+
+@lru_cache(maxsize=4)
+def get_client(project=None, reservation=None):
+    """Return the cached BigQuery client for a project, creating it on first use.
+
+    The client's HTTP session keeps up to HTTP_POOL_SIZE connections alive so
+    concurrent jobs do not queue on the default pool of 10. Without a project,
+    the ADC default project is used. A reservation path
+    ("projects/<p>/locations/<l>/reservations/<r>") becomes the default for
+    every query the client runs.
+    """
+    credentials, default_project = google.auth.default(scopes=bigquery.Client.SCOPE)
+    session = AuthorizedSession(credentials)
+    session.mount('https://', HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE))
+    default_job_config = bigquery.QueryJobConfig(reservation=reservation) if reservation else None
+    return bigquery.Client(project=project or default_project, credentials=credentials, _http=session,
+                           default_query_job_config=default_job_config)
+
+def result_to_arrow(rows, bqstorage_client=None):
+    """Download a query result as an Arrow table over the transport that suits its size.
+
+    Small results are taken from the rows jobs.query returned inline (plus any
+    getQueryResults pages); results of STORAGE_API_MIN_ROWS or more go over the
+    Storage Read API when a client for it is given.
+    """
+    if bqstorage_client is not None and (rows.total_rows or 0) >= STORAGE_API_MIN_ROWS:
+        return rows.to_arrow(bqstorage_client=bqstorage_client)
+    return rows.to_arrow(create_bqstorage_client=False)
+
+def fetch_arrow(client, sql, bqstorage_client=None, job_config=None):
+    """Run a query with query_and_wait and download its result with result_to_arrow."""
+    return result_to_arrow(client.query_and_wait(sql, job_config=job_config), bqstorage_client)
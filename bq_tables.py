@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Shared table definitions for SI²A loaders.
+Schemas mirror sql/01_ddl_tables_fixed.sql and are used by table creation and load jobs alike.
+"""
+
+import numpy as np
+from google.cloud import bigquery
+
+# Explicit schemas so BigQuery never has to infer column types
+INCIDENTS_SCHEMA = [
+    bigquery.SchemaField("incident_id", "STRING"),
+    bigquery.SchemaField("title", "STRING"),
+    bigquery.SchemaField("description", "STRING"),
+    bigquery.SchemaField("severity", "STRING"),
+    bigquery.SchemaField("status", "STRING"),
+    bigquery.SchemaField("created_at", "TIMESTAMP"),
+    bigquery.SchemaField("updated_at", "TIMESTAMP"),
+    bigquery.SchemaField("assigned_to", "STRING"),
+    bigquery.SchemaField("category", "STRING"),
+    bigquery.SchemaField("root_cause", "STRING"),
+    bigquery.SchemaField("resolution", "STRING"),
+    bigquery.SchemaField("resolution_time_hours", "FLOAT"),
+    bigquery.SchemaField("affected_users", "INT64"),
+    bigquery.SchemaField("affected_systems", "STRING", mode="REPEATED"),
+    bigquery.SchemaField("related_incidents", "STRING", mode="REPEATED"),
+    bigquery.SchemaField("policy_violations", "STRING", mode="REPEATED"),
+    bigquery.SchemaField("artifacts", "STRING", mode="REPEATED"),
+    bigquery.SchemaField("tags", "STRING", mode="REPEATED"),
+    bigquery.SchemaField("business_impact", "STRING"),
+    bigquery.SchemaField("risk_score", "FLOAT"),
+    bigquery.SchemaField("risk_category", "STRING"),
+    bigquery.SchemaField("created_by", "STRING"),
+    bigquery.SchemaField("last_modified_by", "STRING"),
+]
+
+# Incidents layout from sql/01_ddl_tables_fixed.sql: PARTITION BY DATE(created_at) CLUSTER BY severity, status, risk_category
+INCIDENTS_PARTITION_FIELD = "created_at"
+INCIDENTS_CLUSTERING = ("severity", "status", "risk_category")
+
+POLICY_SCHEMA = [
+    bigquery.SchemaField("section_id", "STRING"),
+    bigquery.SchemaField("policy_id", "STRING"),
+    bigquery.SchemaField("section_title", "STRING"),
+    bigquery.SchemaField("section_text", "STRING"),
+    bigquery.SchemaField("section_number", "STRING"),
+    bigquery.SchemaField("category", "STRING"),
+    bigquery.SchemaField("compliance_level", "STRING"),
+    bigquery.SchemaField("effective_date", "DATE"),
+    bigquery.SchemaField("expiry_date", "DATE"),
+    bigquery.SchemaField("owner", "STRING"),
+    bigquery.SchemaField("status", "STRING"),
+    bigquery.SchemaField("version", "STRING"),
+]
+
+DAILY_SCHEMA = [
+    bigquery.SchemaField("date", "DATE"),
+    bigquery.SchemaField("total_incidents", "INT64"),
+    bigquery.SchemaField("high_severity_incidents", "INT64"),
+    bigquery.SchemaField("medium_severity_incidents", "INT64"),
+    bigquery.SchemaField("low_severity_incidents", "INT64"),
+    bigquery.SchemaField("avg_resolution_time_hours", "FLOAT"),
+    bigquery.SchemaField("incidents_by_category", "RECORD", fields=[
+        bigquery.SchemaField("security_breach", "INT64"),
+        bigquery.SchemaField("policy_violation", "INT64"),
+        bigquery.SchemaField("system_outage", "INT64"),
+        bigquery.SchemaField("data_leak", "INT64"),
+        bigquery.SchemaField("unauthorized_access", "INT64"),
+    ]),
+    bigquery.SchemaField("created_at", "TIMESTAMP", default_value_expression="CURRENT_TIMESTAMP()"),
+]
+
+# risk_category buckets for risk_score, highest first; rows below every threshold (or
+# without a score) are Minimal. Same bucketing as sql/incident_risk_category.sql.
+RISK_BUCKETS = [
+    (0.8, 'Critical (0.8-1.0)'),
+    (0.6, 'High (0.6-0.79)'),
+    (0.4, 'Medium (0.4-0.59)'),
+    (0.2, 'Low (0.2-0.39)'),
+]
+RISK_FLOOR = 'Minimal (0.0-0.19)'
+
+def risk_category(score):
+    """Return the risk_category bucket for a single risk_score."""
+    for threshold, label in RISK_BUCKETS:
+        if score is not None and score >= threshold:
+            return label
+    return RISK_FLOOR
+
+def risk_categories(scores):
+    """Vectorized risk_category for a column of risk_scores."""
+    scores = np.asarray(scores, dtype=float)
+    return np.select([scores >= threshold for threshold, _ in RISK_BUCKETS],
+                     [label for _, label in RISK_BUCKETS], RISK_FLOOR)
+
+def load_dataframe(client, df, table_id, schema, write_disposition=bigquery.WriteDisposition.WRITE_APPEND):
+    """Load a DataFrame as Parquet using an explicit schema instead of dtype inference.
+
+    Columns the schema does not know about are dropped, and REPEATED fields are
+    written as Arrow list<string> arrays in the same conversion pass. A missing
+    risk_category is derived from risk_score when the schema has one.
+    """
+    schema_names = {field.name for field in schema}
+    if 'risk_category' in schema_names and 'risk_score' in df.columns and 'risk_category' not in df.columns:
+        df = df.assign(risk_category=risk_categories(df['risk_score']))
+    schema = [field for field in schema if field.name in df.columns]
+    job_config = bigquery.LoadJobConfig(
+        source_format=bigquery.SourceFormat.PARQUET,
+        schema=schema,
+        write_disposition=write_disposition,
+        # Tables created by older versions of this loader lack some columns
+        schema_update_options=[bigquery.SchemaUpdateOption.ALLOW_FIELD_ADDITION],
+    )
+    job = client.load_table_from_dataframe(df[[field.name for field in schema]], table_id, job_config=job_config)
+    job.result()
+    return job
@@ -4,24 +4,27 @@ Fix SQL file references to use correct project ID
 """
 
 import os
-import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
 PROJECT_ID = "shadow-it-incident-autopilot"
 
+# Replace all si2a. references with ${PROJECT_ID}.si2a_
+# This handles both dataset and function references
+SI2A_REF = b'`si2a.'
+SI2A_REF_REPLACEMENT = b'`${PROJECT_ID}.si2a_'
+
 def fix_sql_file(file_path):
     """Fix project references in SQL file"""
-    print(f"Fixing {file_path}...")
-    
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    path = Path(file_path)
     
-    # Replace all si2a. references with ${PROJECT_ID}.si2a_
-    # This handles both dataset and function references
-    content = re.sub(r'`si2a\.', f'`${{PROJECT_ID}}.si2a_', content)
+    # Literal bytes replace: no regex engine and no decode/encode round trip
+    content = path.read_bytes().replace(SI2A_REF, SI2A_REF_REPLACEMENT)
     
-    # Write back the file
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(content)
+    # Write to a sibling file and swap it in so the SQL file is never half-written
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_bytes(content)
+    os.replace(tmp_path, path)
     
     print(f"✅ Fixed {file_path}")
 
@@ -34,11 +37,16 @@ def main():
         "sql/04_multimodal_pioneer.sql"
     ]
     
+    existing = []
     for sql_file in sql_files:
         if os.path.exists(sql_file):
-            fix_sql_file(sql_file)
+            existing.append(sql_file)
         else:
             print(f"⚠️ File not found: {sql_file}")
+    
+    # Files are independent, so fix them in parallel
+    with ThreadPoolExecutor(max_workers=len(existing) or 1) as pool:
+        list(pool.map(fix_sql_file, existing))
 
 if __name__ == "__main__":
     main()
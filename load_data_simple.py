@@ -3,150 +3,222 @@
 Simple Data Loading for SI²A - Load synthetic data into BigQuery
 """
 
+import csv
+import json
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
 import pandas as pd
 from google.cloud import bigquery
-from datetime import datetime
+from google.cloud import storage
+
+import bq_client
+from bq_tables import (
+    DAILY_SCHEMA, INCIDENTS_CLUSTERING, INCIDENTS_PARTITION_FIELD, INCIDENTS_SCHEMA, POLICY_SCHEMA, load_dataframe,
+    risk_category,
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 PROJECT_ID = os.getenv("PROJECT_ID", "shadow-it-incident-autopilot")
+# Optional GCS bucket for staging CSVs; when set, loads skip the pandas round-trip
+STAGING_BUCKET = os.getenv("STAGING_BUCKET")
+CSV_CHUNK_ROWS = 100_000
+
+def get_client():
+    """Return the shared BigQuery client for PROJECT_ID."""
+    return bq_client.get_client(PROJECT_ID)
+
+def split_semicolons(value):
+    """Split a semicolon-delimited CSV cell into a list of non-empty items."""
+    return [part for part in (value or '').split(';') if part]
+
+def csv_to_ndjson(csv_path, array_cols=()):
+    """Stream a CSV into newline-delimited JSON next to it, one row at a time.
+
+    REPEATED columns cannot be expressed in a CSV load job, so array columns
+    are parsed here; blank cells become NULLs. Rows with a risk_score also get
+    their risk_category.
+    """
+    ndjson_path = Path(csv_path).with_suffix('.ndjson')
+    with open(csv_path, newline='', encoding='utf-8') as src, \
+            open(ndjson_path, 'w', encoding='utf-8') as dst:
+        for row in csv.DictReader(src, quotechar='"', escapechar='\\'):
+            record = {k: (v if v != '' else None) for k, v in row.items() if k is not None}
+            for col in array_cols:
+                record[col] = split_semicolons(row.get(col))
+            if 'risk_score' in record and 'risk_category' not in record:
+                score = record['risk_score']
+                record['risk_category'] = risk_category(float(score) if score is not None else None)
+            dst.write(json.dumps(record) + '\n')
+    return ndjson_path
+
+def load_via_gcs(client, csv_path, table_id, schema, array_cols=(), partition_field=None, clustering_fields=()):
+    """Upload a CSV to the staging bucket and load it with a BigQuery load job.
+
+    A truncating load must restate the table's partitioning and clustering, so
+    pass them for tables that have them. Returns the number of rows written.
+    """
+    ndjson_path = csv_to_ndjson(csv_path, array_cols)
+    blob_name = f"staging/{ndjson_path.name}"
+    storage.Client(project=PROJECT_ID).bucket(STAGING_BUCKET).blob(blob_name).upload_from_filename(str(ndjson_path))
+
+    job_config = bigquery.LoadJobConfig(
+        source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
+        schema=schema,
+        write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
+        ignore_unknown_values=True,
+    )
+    if partition_field:
+        job_config.time_partitioning = bigquery.TimePartitioning(field=partition_field)
+    if clustering_fields:
+        job_config.clustering_fields = list(clustering_fields)
+    job = client.load_table_from_uri(f"gs://{STAGING_BUCKET}/{blob_name}", table_id, job_config=job_config)
+    job.result()
+    return job.output_rows
+
+def _to_dates(df, date_cols):
+    for col in date_cols:
+        df[col] = df[col].dt.date
+    return df
+
+def parse_csv(csv_path, array_cols=(), timestamp_cols=(), date_cols=(), string_cols=(), chunksize=None):
+    """Read a synthetic-data CSV, converting array, timestamp and date columns while parsing.
+
+    String columns are read as text so values like '1.1' are not inferred as
+    floats. With a chunksize, returns an iterator of DataFrames instead of a
+    single frame.
+    """
+    reader = pd.read_csv(
+        csv_path,
+        quotechar='"',
+        escapechar='\\',
+        converters={col: split_semicolons for col in array_cols},
+        dtype={col: str for col in string_cols},
+        parse_dates=list(timestamp_cols) + list(date_cols),
+        chunksize=chunksize,
+    )
+    if chunksize is None:
+        return _to_dates(reader, date_cols)
+    return (_to_dates(chunk, date_cols) for chunk in reader)
+
+def _fresh_parquet(csv_path):
+    """Return the Parquet copy written by prep_parquet.py if it is at least as new as the CSV."""
+    csv_path = Path(csv_path)
+    parquet_path = csv_path.with_suffix('.parquet')
+    if parquet_path.exists() and (not csv_path.exists() or parquet_path.stat().st_mtime >= csv_path.stat().st_mtime):
+        return parquet_path
+    return None
+
+def iter_data_file(csv_path, array_cols=(), timestamp_cols=(), date_cols=(), string_cols=(), chunksize=CSV_CHUNK_ROWS):
+    """Yield a data file as DataFrames, preferring the typed Parquet copy written by prep_parquet.py.
+
+    CSVs are read in chunks so peak memory stays at one chunk.
+    """
+    parquet_path = _fresh_parquet(csv_path)
+    if parquet_path:
+        yield pd.read_parquet(parquet_path, engine='pyarrow')
+        return
+    yield from parse_csv(csv_path, array_cols, timestamp_cols, date_cols, string_cols, chunksize=chunksize)
 
 def ensure_datasets_and_tables():
-    """Ensure required datasets and minimal tables exist in the target project."""
-    client = bigquery.Client(project=PROJECT_ID)
-
-    # Ensure datasets
-    for ds in ["si2a_gold", "si2a_dim", "si2a_marts"]:
-        ref = bigquery.Dataset(f"{PROJECT_ID}.{ds}")
-        try:
-            client.get_dataset(ref)
-        except Exception:
-            client.create_dataset(ref, exists_ok=True)
-
-    # Ensure tables with minimal schema used by this loader
+    """Ensure required datasets and tables exist in the target project."""
+    client = get_client()
+
+    # Ensure datasets (exists_ok makes a separate existence probe unnecessary)
+    datasets = [bigquery.Dataset(f"{PROJECT_ID}.{ds}") for ds in ["si2a_gold", "si2a_dim", "si2a_marts"]]
+    with ThreadPoolExecutor(max_workers=len(datasets)) as pool:
+        list(pool.map(lambda ref: client.create_dataset(ref, exists_ok=True), datasets))
+
+    # Ensure tables used by this loader
     tables = {
-        f"{PROJECT_ID}.si2a_gold.incidents": [
-            bigquery.SchemaField("incident_id", "STRING"),
-            bigquery.SchemaField("title", "STRING"),
-            bigquery.SchemaField("description", "STRING"),
-            bigquery.SchemaField("severity", "STRING"),
-            bigquery.SchemaField("status", "STRING"),
-            bigquery.SchemaField("created_at", "TIMESTAMP"),
-            bigquery.SchemaField("updated_at", "TIMESTAMP"),
-            bigquery.SchemaField("assigned_to", "STRING"),
-            bigquery.SchemaField("category", "STRING"),
-            bigquery.SchemaField("root_cause", "STRING"),
-            bigquery.SchemaField("resolution", "STRING"),
-            bigquery.SchemaField("resolution_time_hours", "FLOAT"),
-            bigquery.SchemaField("affected_users", "INT64"),
-            bigquery.SchemaField("affected_systems", "STRING", mode="REPEATED"),
-            bigquery.SchemaField("tags", "STRING", mode="REPEATED"),
-            bigquery.SchemaField("business_impact", "STRING"),
-            bigquery.SchemaField("risk_score", "FLOAT"),
-        ],
-        f"{PROJECT_ID}.si2a_dim.policy_sections": [
-            bigquery.SchemaField("section_id", "STRING"),
-            bigquery.SchemaField("policy_id", "STRING"),
-            bigquery.SchemaField("section_title", "STRING"),
-            bigquery.SchemaField("section_text", "STRING"),
-            bigquery.SchemaField("effective_date", "DATE"),
-            bigquery.SchemaField("expiry_date", "DATE"),
-        ],
-        f"{PROJECT_ID}.si2a_marts.incident_daily": [
-            bigquery.SchemaField("date", "DATE"),
-            bigquery.SchemaField("total_incidents", "INT64"),
-            bigquery.SchemaField("high_severity_incidents", "INT64"),
-            bigquery.SchemaField("medium_severity_incidents", "INT64"),
-            bigquery.SchemaField("low_severity_incidents", "INT64"),
-            bigquery.SchemaField("avg_resolution_time_hours", "FLOAT"),
-        ],
+        f"{PROJECT_ID}.si2a_gold.incidents": INCIDENTS_SCHEMA,
+        f"{PROJECT_ID}.si2a_dim.policy_sections": POLICY_SCHEMA,
+        f"{PROJECT_ID}.si2a_marts.incident_daily": DAILY_SCHEMA,
     }
 
-    for table_id, schema in tables.items():
-        try:
-            client.get_table(table_id)
-        except Exception:
-            client.create_table(bigquery.Table(table_id, schema=schema), exists_ok=True)
+    table_objs = [bigquery.Table(table_id, schema=schema) for table_id, schema in tables.items()]
+    # incidents is partitioned and clustered like the DDL
+    table_objs[0].time_partitioning = bigquery.TimePartitioning(field=INCIDENTS_PARTITION_FIELD)
+    table_objs[0].clustering_fields = list(INCIDENTS_CLUSTERING)
 
-def load_incidents_data():
-    """Load incidents data with proper CSV handling"""
-    logger.info("📊 Loading synthetic incidents data...")
-    try:
-        # Read CSV with proper handling
-        df = pd.read_csv('data/synthetic_incidents.csv', quotechar='"', escapechar='\\')
-        
-        # Convert string arrays to actual arrays
-        df['affected_systems'] = df['affected_systems'].str.split(';')
-        df['tags'] = df['tags'].str.split(';')
-        df['artifacts'] = df['artifacts'].str.split(';')
-        
-        # Convert timestamps
-        df['created_at'] = pd.to_datetime(df['created_at'])
-        df['updated_at'] = pd.to_datetime(df['updated_at'])
-        
-        # Load to BigQuery
-        client = bigquery.Client(project=PROJECT_ID)
-        table_id = f"{PROJECT_ID}.si2a_gold.incidents"
-        
-        # Clear existing data
-        client.query(f"DELETE FROM `{table_id}` WHERE TRUE").result()
-        
-        # Load new data
-        job_config = bigquery.LoadJobConfig(write_disposition=bigquery.WriteDisposition.WRITE_APPEND)
-        job = client.load_table_from_dataframe(df, table_id, job_config=job_config)
-        job.result()
-        
-        logger.info(f"✅ Loaded {len(df)} incidents successfully!")
-        return True
-        
-    except Exception as e:
-        logger.error(f"❌ Failed to load incidents: {e}")
-        return False
+    with ThreadPoolExecutor(max_workers=len(table_objs)) as pool:
+        list(pool.map(lambda table: client.create_table(table, exists_ok=True), table_objs))
+
+@dataclass(frozen=True)
+class LoaderSpec:
+    """Where a synthetic-data file goes and which columns need converting on the way."""
+    name: str
+    icon: str
+    csv_path: str
+    table_id: str
+    schema: list
+    array_cols: tuple = ()
+    timestamp_cols: tuple = ()
+    date_cols: tuple = ()
+    partition_field: Optional[str] = None
+    clustering_fields: tuple = ()
+
+    @property
+    def string_cols(self):
+        """Scalar STRING columns of the schema, which must not go through pandas type inference."""
+        converted = set(self.array_cols) | set(self.timestamp_cols) | set(self.date_cols)
+        return tuple(field.name for field in self.schema
+                     if field.field_type == 'STRING' and field.mode != 'REPEATED' and field.name not in converted)
 
-def load_policy_sections_data():
-    """Load policy sections data"""
-    logger.info("📜 Loading synthetic policy sections data...")
+INCIDENTS_SPEC = LoaderSpec('incidents', '📊', 'data/synthetic_incidents.csv', f"{PROJECT_ID}.si2a_gold.incidents",
+                            INCIDENTS_SCHEMA, array_cols=('affected_systems', 'tags', 'artifacts'),
+                            timestamp_cols=('created_at', 'updated_at'),
+                            partition_field=INCIDENTS_PARTITION_FIELD, clustering_fields=INCIDENTS_CLUSTERING)
+POLICY_SPEC = LoaderSpec('policy sections', '📜', 'data/synthetic_policy_sections.csv',
+                         f"{PROJECT_ID}.si2a_dim.policy_sections", POLICY_SCHEMA,
+                         date_cols=('effective_date', 'expiry_date'))
+DAILY_SPEC = LoaderSpec('daily metrics', '📈', 'data/synthetic_daily_metrics.csv',
+                        f"{PROJECT_ID}.si2a_marts.incident_daily", DAILY_SCHEMA, date_cols=('date',))
+
+# Tables loaded from files by this script; daily metrics come from SAMPLE_DAILY_METRICS
+TABLES = [INCIDENTS_SPEC, POLICY_SPEC]
+
+def load_table(spec):
+    """Replace a table's rows with the contents of its data file; returns the rows loaded."""
+    client = get_client()
+    if STAGING_BUCKET:
+        return load_via_gcs(client, spec.csv_path, spec.table_id, spec.schema, spec.array_cols,
+                            spec.partition_field, spec.clustering_fields)
+
+    # Clear existing data, then stream the file to BigQuery one chunk at a time
+    client.query(f"DELETE FROM `{spec.table_id}` WHERE TRUE").result()
+    loaded = 0
+    for df in iter_data_file(spec.csv_path, spec.array_cols, spec.timestamp_cols, spec.date_cols, spec.string_cols):
+        load_dataframe(client, df, spec.table_id, spec.schema)
+        loaded += len(df)
+    return loaded
+
+def _load_logged(spec):
+    logger.info(f"{spec.icon} Loading synthetic {spec.name} data...")
     try:
-        df = pd.read_csv('data/synthetic_policy_sections.csv', quotechar='"', escapechar='\\')
-        
-        # Convert timestamps
-        df['effective_date'] = pd.to_datetime(df['effective_date'])
-        df['expiry_date'] = pd.to_datetime(df['expiry_date'])
-        
-        # Load to BigQuery
-        client = bigquery.Client(project=PROJECT_ID)
-        table_id = f"{PROJECT_ID}.si2a_dim.policy_sections"
-        
-        # Clear existing data
-        client.query(f"DELETE FROM `{table_id}` WHERE TRUE").result()
-        
-        # Load new data
-        job_config = bigquery.LoadJobConfig(write_disposition=bigquery.WriteDisposition.WRITE_APPEND)
-        job = client.load_table_from_dataframe(df, table_id, job_config=job_config)
-        job.result()
-        
-        logger.info(f"✅ Loaded {len(df)} policy sections successfully!")
+        rows = load_table(spec)
+        via = f" via gs://{STAGING_BUCKET}" if STAGING_BUCKET else ""
+        logger.info(f"✅ Loaded {rows} {spec.name} successfully{via}!")
         return True
-        
     except Exception as e:
-        logger.error(f"❌ Failed to load policy sections: {e}")
+        logger.error(f"❌ Failed to load {spec.name}: {e}")
         return False
 
-def create_sample_daily_metrics():
-    """Create sample daily metrics directly in BigQuery"""
-    logger.info("📈 Creating sample daily metrics...")
-    try:
-        client = bigquery.Client(project=PROJECT_ID)
-        
-        # Create sample daily metrics SQL
-        sql = f"""
-        INSERT INTO `{PROJECT_ID}.si2a_marts.incident_daily`
-        (date, total_incidents, high_severity_incidents, medium_severity_incidents, low_severity_incidents, avg_resolution_time_hours)
-        VALUES
+def load_tables(specs):
+    """Load independent tables in parallel; returns one success flag per spec."""
+    with ThreadPoolExecutor(max_workers=len(specs)) as pool:
+        return list(pool.map(_load_logged, specs))
+
+SAMPLE_DAILY_METRICS = [
+    {"date": date, "total_incidents": total, "high_severity_incidents": high,
+     "medium_severity_incidents": medium, "low_severity_incidents": low, "avg_resolution_time_hours": hours}
+    for date, total, high, medium, low, hours in [
         ('2024-01-15', 1, 0, 1, 0, 4.5),
         ('2024-01-16', 1, 1, 0, 0, 2.0),
         ('2024-01-17', 2, 0, 1, 1, 3.2),
@@ -156,14 +228,24 @@ def create_sample_daily_metrics():
         ('2024-01-21', 1, 0, 1, 0, 2.3),
         ('2024-01-22', 3, 1, 1, 1, 4.1),
         ('2024-01-23', 1, 0, 0, 1, 1.8),
-        ('2024-01-24', 2, 0, 2, 0, 3.7)
-        """
+        ('2024-01-24', 2, 0, 2, 0, 3.7),
+    ]
+]
+
+def create_sample_daily_metrics():
+    """Create sample daily metrics directly in BigQuery"""
+    logger.info("📈 Creating sample daily metrics...")
+    try:
+        client = get_client()
         
-        # Clear existing data first
-        client.query(f"DELETE FROM `{PROJECT_ID}.si2a_marts.incident_daily` WHERE TRUE").result()
+        table_id = f"{PROJECT_ID}.si2a_marts.incident_daily"
         
-        # Insert new data
-        client.query(sql).result()
+        # A truncating load job replaces the rows in one commit, without DELETE/INSERT DML
+        job_config = bigquery.LoadJobConfig(
+            schema=DAILY_SCHEMA,
+            write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
+        )
+        client.load_table_from_json(SAMPLE_DAILY_METRICS, table_id, job_config=job_config).result()
         
         logger.info("✅ Created sample daily metrics successfully!")
         return True
@@ -176,22 +258,21 @@ def verify_data_loading():
     """Verify that data was loaded successfully"""
     logger.info("🔍 Verifying data loading...")
     try:
-        client = bigquery.Client(project=PROJECT_ID)
-        
-        # Check incidents
-        incidents_query = f"SELECT COUNT(*) as count FROM `{PROJECT_ID}.si2a_gold.incidents`"
-        incidents_result = client.query(incidents_query).result()
-        incidents_count = list(incidents_result)[0].count
+        client = get_client()
         
-        # Check policy sections
-        policy_query = f"SELECT COUNT(*) as count FROM `{PROJECT_ID}.si2a_dim.policy_sections`"
-        policy_result = client.query(policy_query).result()
-        policy_count = list(policy_result)[0].count
-        
-        # Check daily metrics
-        metrics_query = f"SELECT COUNT(*) as count FROM `{PROJECT_ID}.si2a_marts.incident_daily`"
-        metrics_result = client.query(metrics_query).result()
-        metrics_count = list(metrics_result)[0].count
+        # Read row counts from table metadata in one query instead of three COUNT(*) scans
+        query = f"""
+        SELECT dataset_id, table_id, row_count FROM `{PROJECT_ID}.si2a_gold.__TABLES__` WHERE table_id = 'incidents'
+        UNION ALL
+        SELECT dataset_id, table_id, row_count FROM `{PROJECT_ID}.si2a_dim.__TABLES__` WHERE table_id = 'policy_sections'
+        UNION ALL
+        SELECT dataset_id, table_id, row_count FROM `{PROJECT_ID}.si2a_marts.__TABLES__` WHERE table_id = 'incident_daily'
+        """
+        rows = client.query_and_wait(query, wait_timeout=10.0)
+        counts = {f"{row.dataset_id}.{row.table_id}": row.row_count for row in rows}
+        incidents_count = counts.get("si2a_gold.incidents", 0)
+        policy_count = counts.get("si2a_dim.policy_sections", 0)
+        metrics_count = counts.get("si2a_marts.incident_daily", 0)
         
         logger.info(f"📊 Data Verification Results:")
         logger.info(f"   • Incidents: {incidents_count}")
@@ -218,13 +299,8 @@ def main():
     
     success_count = 0
     
-    # Load incidents
-    if load_incidents_data():
-        success_count += 1
-    
-    # Load policy sections
-    if load_policy_sections_data():
-        success_count += 1
+    # Load incidents and policy sections
+    success_count += sum(load_tables(TABLES))
     
     # Create daily metrics
     if create_sample_daily_metrics():
@@ -5,61 +5,63 @@ Output: data/synthetic_incidents_clean.csv
 """
 from pathlib import Path
 import csv
+import mmap
+
+import numpy as np
 
 INPUT = Path('data') / 'synthetic_incidents.csv'
 OUTPUT = Path('data') / 'synthetic_incidents_clean.csv'
 
+_QUOTE, _COMMA, _OPEN, _CLOSE = (ord(c) for c in '",[]')
+
+def split_line(data: bytes):
+    """Split UTF-8 bytes on commas that are outside quotes and brackets.
+
+    Works on the bytes as a NumPy array: quote parity and bracket depth
+    are running sums, so the split points fall out of one vectorized pass.
+    The delimiters are ASCII, so slicing the bytes never cuts a multibyte char.
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    in_quotes = np.cumsum(buf == _QUOTE) % 2
+    depth = np.cumsum((buf == _OPEN).astype(np.int64) - (buf == _CLOSE))
+    # Unbalanced ']' never takes the depth below zero
+    depth -= np.minimum(np.minimum.accumulate(depth), 0)
+    cuts = np.flatnonzero((buf == _COMMA) & (in_quotes == 0) & (depth == 0))
+    starts = np.concatenate(([0], cuts + 1))
+    ends = np.concatenate((cuts, [len(data)]))
+    return [data[a:b].decode('utf-8').strip() for a, b in zip(starts, ends)]
+
 def smart_split(row: str):
-    fields = []
-    current = []
-    in_quotes = False
-    bracket_level = 0
-    i = 0
-    while i < len(row):
-        ch = row[i]
-        if ch == '"':
-            in_quotes = not in_quotes
-            current.append(ch)
-        elif ch == '[':
-            bracket_level += 1
-            current.append(ch)
-        elif ch == ']':
-            bracket_level = max(0, bracket_level - 1)
-            current.append(ch)
-        elif ch == ',' and not in_quotes and bracket_level == 0:
-            fields.append(''.join(current).strip())
-            current = []
-        else:
-            current.append(ch)
-        i += 1
-    fields.append(''.join(current).strip())
-    return fields
+    return split_line(row.encode('utf-8'))
 
 def main():
-    lines = INPUT.read_text(encoding='utf-8').splitlines()
-    if not lines:
+    if not INPUT.exists() or INPUT.stat().st_size == 0:
         raise SystemExit('Input CSV is empty')
-    header = lines[0]
-    header_cols = header.split(',')
-    expected_cols = len(header_cols)
 
-    with OUTPUT.open('w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(header_cols)
-        for idx, line in enumerate(lines[1:], start=2):
-            if not line.strip():
-                continue
-            cols = smart_split(line)
-            if len(cols) != expected_cols:
-                # Try to join overflow columns back into the last column
-                if len(cols) > expected_cols:
-                    head = cols[:expected_cols-1]
-                    tail = ','.join(cols[expected_cols-1:])
-                    cols = head + [tail]
-                else:
-                    # Pad missing columns
-                    cols = cols + [''] * (expected_cols - len(cols))
-            writer.writerow(cols)
+    # Map the file and walk it line by line, so only the current line is ever decoded
+    with INPUT.open('rb') as src, mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        header = mm.readline().decode('utf-8').rstrip('\r\n')
+        header_cols = header.split(',')
+        expected_cols = len(header_cols)
+
+        with OUTPUT.open('w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(header_cols)
+            for raw in iter(mm.readline, b''):
+                line = raw.rstrip(b'\r\n')
+                if not line.strip():
+                    continue
+                cols = split_line(line)
+                if len(cols) != expected_cols:
+                    # Try to join overflow columns back into the last column
+                    if len(cols) > expected_cols:
+                        head = cols[:expected_cols-1]
+                        tail = ','.join(cols[expected_cols-1:])
+                        cols = head + [tail]
+                    else:
+                        # Pad missing columns
+                        cols = cols + [''] * (expected_cols - len(cols))
+                writer.writerow(cols)
     print(f"Wrote cleaned CSV to {OUTPUT}")
 
 if __name__ == '__main__':
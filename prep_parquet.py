@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Convert the synthetic CSVs to typed, snappy-compressed Parquet once.
+The loaders pick up data/*.parquet automatically while it is newer than the CSV.
+"""
+from pathlib import Path
+
+from load_data_simple import DAILY_SPEC, INCIDENTS_SPEC, POLICY_SPEC, parse_csv
+
+# The loader specs carry the column conversions applied before writing Parquet
+SOURCES = [INCIDENTS_SPEC, POLICY_SPEC, DAILY_SPEC]
+
+def main():
+    for spec in SOURCES:
+        csv_path = Path(spec.csv_path)
+        if not csv_path.exists():
+            print(f"⚠️ File not found: {csv_path}")
+            continue
+        parquet_path = csv_path.with_suffix('.parquet')
+        df = parse_csv(csv_path, spec.array_cols, spec.timestamp_cols, spec.date_cols, spec.string_cols)
+        df.to_parquet(parquet_path, engine='pyarrow', compression='snappy', index=False)
+        print(f"✅ Wrote {len(df)} rows to {parquet_path}")
+
+if __name__ == '__main__':
+    main()
@@ -7,6 +7,8 @@ import os
 import logging
 from google.cloud import bigquery
 
+from run_sql_setup import run_sql_file
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -14,36 +16,6 @@ logger = logging.getLogger(__name__)
 PROJECT_ID = os.getenv("PROJECT_ID", "shadow-it-incident-autopilot")
 LOCATION = os.getenv("BIGQUERY_LOCATION", "US")
 
-def run_sql_file(client, file_path):
-    """Execute SQL file"""
-    logger.info(f"Executing {file_path}...")
-    
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            sql = f.read()
-        
-        # Replace placeholders
-        sql = sql.replace('${PROJECT_ID}', PROJECT_ID)
-        sql = sql.replace('${LOCATION}', LOCATION)
-        
-        # Split by semicolon and execute each statement
-        statements = [stmt.strip() for stmt in sql.split(';') if stmt.strip() and not stmt.strip().startswith('--')]
-        
-        for i, statement in enumerate(statements):
-            if statement:
-                try:
-                    query_job = client.query(statement)
-                    query_job.result()  # Wait for completion
-                    logger.info(f"✅ Statement {i+1} executed successfully")
-                except Exception as e:
-                    logger.warning(f"⚠️ Statement {i+1} failed: {e}")
-                    # Continue with next statement
-        
-        logger.info(f"✅ Completed {file_path}")
-        
-    except Exception as e:
-        logger.error(f"❌ Failed to execute {file_path}: {e}")
-
 def main():
     """Main function"""
     logger.info(f"🚀 Running complete SI²A setup for project: {PROJECT_ID}")
@@ -56,7 +28,14 @@ def main():
         sql_files = [
             "sql/01_ddl_tables_fixed.sql",
             "sql/02_embeddings_and_vector_search_fixed.sql",
-            "sql/03_generative_ai_architect_fixed.sql"
+            "sql/03_generative_ai_architect_fixed.sql",
+            # Adds and backfills the stored risk buckets read by mv_risk_distribution
+            "sql/incident_risk_category.sql",
+            # Dashboard aggregates, materialized over si2a_gold.incidents
+            "sql/mv_incident_metrics.sql",
+            "sql/mv_risk_distribution.sql",
+            "sql/mv_trends_daily.sql",
+            "sql/incident_daily_snap.sql",
         ]
         
         for sql_file in sql_files:
@@ -4,7 +4,13 @@ Run SQL setup files using BigQuery client
 """
 
 import os
+import re
+import json
+import hashlib
 import logging
+from pathlib import Path
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from google.cloud import bigquery
 
 # Configure logging
@@ -13,31 +19,118 @@ logger = logging.getLogger(__name__)
 
 PROJECT_ID = os.getenv("PROJECT_ID", "shadow-it-incident-autopilot")
 LOCATION = os.getenv("BIGQUERY_LOCATION", "US")
+MAX_CONCURRENT_STATEMENTS = 16
+# Rendered, split statements are kept here between runs, keyed by file path, mtime and settings
+SQL_CACHE_DIR = Path(".sql_cache")
+# Part of the cache key; bump whenever rendering or split_statements changes its output
+SQL_CACHE_VERSION = 1
+
+# Backticked object names, and the object a DDL/DML statement writes to
+OBJECT_REF = re.compile(r'`([^`]+)`')
+WRITE_TARGET = re.compile(
+    r'^\s*(?:CREATE\b[^`;]*?|INSERT\s+(?:INTO\s+)?|DELETE\s+(?:FROM\s+)?|UPDATE\s+|'
+    r'MERGE\s+(?:INTO\s+)?|ALTER\s+\w+\s+|DROP\s+[\w\s]*?)`([^`]+)`',
+    re.IGNORECASE,
+)
+
+# Quoted strings and comments are matched whole so a ';' inside them never splits a statement
+SQL_TOKEN = re.compile(
+    r"'''.*?'''|\"\"\".*?\"\"\"|'(?:[^'\\\n]|\\.)*'|\"(?:[^\"\\\n]|\\.)*\"|`[^`]*`"
+    r"|--[^\n]*|/\*.*?\*/|;|[^'\"`;/-]+|.",
+    re.DOTALL,
+)
+COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+
+def split_statements(sql):
+    """Split a SQL script on top-level semicolons, dropping comment-only chunks."""
+    statements = []
+    current = []
+    for token in SQL_TOKEN.findall(sql + ';'):
+        if token != ';':
+            current.append(token)
+            continue
+        statement = ''.join(current).strip()
+        if COMMENT.sub('', statement).strip():
+            statements.append(statement)
+        current = []
+    return statements
+
+@lru_cache(maxsize=None)
+def _load_statements(file_path, mtime):
+    resolved = Path(file_path).resolve()
+    cache_key = hashlib.sha1(f"{SQL_CACHE_VERSION}|{resolved}|{mtime}|{PROJECT_ID}|{LOCATION}".encode()).hexdigest()
+    cache_path = SQL_CACHE_DIR / f"{Path(file_path).name}.{cache_key}.json"
+    if cache_path.exists():
+        return tuple(json.loads(cache_path.read_text(encoding='utf-8')))
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        sql = f.read()
+    
+    # Replace placeholders
+    sql = sql.replace('${PROJECT_ID}', PROJECT_ID)
+    sql = sql.replace('${LOCATION}', LOCATION)
+    statements = split_statements(sql)
+
+    try:
+        SQL_CACHE_DIR.mkdir(exist_ok=True)
+        tmp_path = cache_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(statements), encoding='utf-8')
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"⚠️ Could not cache statements for {file_path}: {e}")
+    return tuple(statements)
+
+def load_statements(file_path):
+    """Read, render and split a SQL file, reusing the result until the file or settings change."""
+    return _load_statements(file_path, os.path.getmtime(file_path))
+
+def plan_levels(statements):
+    """Group statement indexes into levels whose members can run concurrently.
+
+    A statement waits for earlier writers of any object it references, and a
+    writer also waits for earlier readers of its target. Statements whose
+    target cannot be determined act as barriers.
+    """
+    levels = []
+    last_write = {}
+    last_read = {}
+    barrier = -1
+    for i, statement in enumerate(statements):
+        body = COMMENT.sub('', statement)
+        match = WRITE_TARGET.match(body)
+        if match is None:
+            level = len(levels)
+            barrier = level
+        else:
+            target = match.group(1)
+            refs = set(OBJECT_REF.findall(body))
+            level = 1 + max([barrier, last_read.get(target, -1)] + [last_write.get(r, -1) for r in refs])
+            for ref in refs - {target}:
+                last_read[ref] = max(last_read.get(ref, -1), level)
+            last_write[target] = level
+        if level == len(levels):
+            levels.append([])
+        levels[level].append(i)
+    return levels
 
 def run_sql_file(client, file_path):
     """Execute SQL file"""
     logger.info(f"Executing {file_path}...")
     
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            sql = f.read()
-        
-        # Replace placeholders
-        sql = sql.replace('${PROJECT_ID}', PROJECT_ID)
-        sql = sql.replace('${LOCATION}', LOCATION)
-        
-        # Split by semicolon and execute each statement
-        statements = [stmt.strip() for stmt in sql.split(';') if stmt.strip() and not stmt.strip().startswith('--')]
+        statements = load_statements(file_path)
         
-        for i, statement in enumerate(statements):
-            if statement:
-                try:
-                    query_job = client.query(statement)
-                    query_job.result()  # Wait for completion
-                    logger.info(f"✅ Statement {i+1} executed successfully")
-                except Exception as e:
-                    logger.warning(f"⚠️ Statement {i+1} failed: {e}")
-                    # Continue with next statement
+        # Independent statements are submitted together; each level waits for the previous one
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_STATEMENTS) as pool:
+            for level in plan_levels(statements):
+                futures = {i: pool.submit(lambda s: client.query(s).result(), statements[i]) for i in level}
+                for i, future in futures.items():
+                    try:
+                        future.result()
+                        logger.info(f"✅ Statement {i+1} executed successfully")
+                    except Exception as e:
+                        logger.warning(f"⚠️ Statement {i+1} failed: {e}")
+                        # Continue with next statement
         
         logger.info(f"✅ Completed {file_path}")
         
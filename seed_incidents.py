@@ -30,18 +30,22 @@ CREATE TABLE IF NOT EXISTS `{PROJECT_ID}.si2a_gold.incidents` (
   affected_systems ARRAY<STRING>,
   tags ARRAY<STRING>,
   business_impact STRING,
-  risk_score FLOAT64
+  risk_score FLOAT64,
+  risk_category STRING
 )
+PARTITION BY DATE(created_at)
+CLUSTER BY severity, status, risk_category
 """
 
 insert_sql = f"""
 INSERT INTO `{PROJECT_ID}.si2a_gold.incidents`
-(incident_id,title,description,severity,status,created_at,assigned_to,category,root_cause,resolution,resolution_time_hours,affected_users,affected_systems,tags,business_impact,risk_score)
-VALUES ('INC-BOOT-001','Bootstrap Incident','Seed row','medium','resolved',CURRENT_TIMESTAMP(),'analyst','general','N/A','N/A',2.5,1,['sys'],['seed'],'Low impact',0.5)
+(incident_id,title,description,severity,status,created_at,assigned_to,category,root_cause,resolution,resolution_time_hours,affected_users,affected_systems,tags,business_impact,risk_score,risk_category)
+VALUES ('INC-BOOT-001','Bootstrap Incident','Seed row','medium','resolved',CURRENT_TIMESTAMP(),'analyst','general','N/A','N/A',2.5,1,['sys'],['seed'],'Low impact',0.5,'Medium (0.4-0.59)')
 """
 
-client.query(create_sql).result()
-client.query(insert_sql).result()
+# One multi-statement script runs both statements in a single job
+script = create_sql + ";\n" + insert_sql
+client.query(script).result()
 print("Seeded incidents table with 1 row")
 
 
@@ -5,8 +5,10 @@ Automates the creation of BigQuery datasets, tables, and AI functions
 """
 
 import os
+import re
 import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from google.cloud import bigquery
 from google.cloud import storage
 from google.auth import default
@@ -19,6 +21,10 @@ logger = logging.getLogger(__name__)
 PROJECT_ID = "shadow-it-incident-autopilot"  # Updated project ID
 LOCATION = "US"
 
+# Only these exact ${...} placeholders are filled in; any other $ text in the SQL is left alone
+SQL_PLACEHOLDERS = {"PROJECT_ID": PROJECT_ID, "LOCATION": LOCATION}
+SQL_PLACEHOLDER_RE = re.compile(r"\$\{(PROJECT_ID|LOCATION)\}")
+
 def create_datasets(client):
     """Create all required datasets"""
     datasets = [
@@ -65,12 +71,9 @@ def create_gcs_bucket():
 def execute_sql_file(client, file_path):
     """Execute SQL file"""
     try:
+        # Replace placeholders in a single pass over the file
         with open(file_path, 'r') as f:
-            sql = f.read()
-        
-        # Replace placeholders
-        sql = sql.replace('${PROJECT_ID}', PROJECT_ID)
-        sql = sql.replace('${LOCATION}', LOCATION)
+            sql = SQL_PLACEHOLDER_RE.sub(lambda m: SQL_PLACEHOLDERS[m.group(1)], f.read())
         
         query_job = client.query(sql)
         query_job.result()  # Wait for completion
@@ -97,20 +100,22 @@ def main():
         logger.info("🪣 Creating Cloud Storage bucket...")
         create_gcs_bucket()
         
-        # Execute SQL files in order
-        sql_files = [
-            "sql/01_ddl_tables.sql",
-            "sql/02_embeddings_and_vector_search.sql",
-            "sql/03_generative_ai_architect.sql",
-            "sql/04_multimodal_pioneer.sql"
+        # Execute SQL files phase by phase; files within a phase run concurrently
+        sql_phases = [
+            ["sql/01_ddl_tables.sql"],
+            # 03 and 04 read the embedding models and tables that 02 creates
+            ["sql/02_embeddings_and_vector_search.sql"],
+            ["sql/03_generative_ai_architect.sql", "sql/04_multimodal_pioneer.sql"],
         ]
         
         logger.info("🔧 Executing SQL setup files...")
-        for sql_file in sql_files:
-            if os.path.exists(sql_file):
-                execute_sql_file(client, sql_file)
-            else:
+        for sql_files in sql_phases:
+            present = [f for f in sql_files if os.path.exists(f)]
+            for sql_file in sorted(set(sql_files) - set(present)):
                 logger.warning(f"⚠️ SQL file not found: {sql_file}")
+            if present:
+                with ThreadPoolExecutor(max_workers=len(present)) as pool:
+                    list(pool.map(lambda f: execute_sql_file(client, f), present))
         
         logger.info("🎉 SI²A setup completed successfully!")
         logger.info("📋 Next steps:")
@@ -5,10 +5,10 @@ Setup BigQuery for local SI²A demo:
 - Loads `data/synthetic_incidents_clean.csv` into `si2a_gold.incidents_raw` with correct columns
 - Creates or replaces TABLE `si2a_gold.incidents` with proper types and parsed arrays
 """
+import csv
 import os
 from pathlib import Path
 from google.cloud import bigquery
-import pandas as pd
 
 PROJECT_ID = os.getenv('PROJECT_ID', 'shadow-it-incident-autopilot')
 DATASET_ID = 'si2a_gold'
@@ -25,44 +25,43 @@ EXPECTED_COLUMNS = [
 def ensure_dataset(client: bigquery.Client, dataset_id: str) -> None:
     dataset_ref = bigquery.Dataset(f"{client.project}.{dataset_id}")
     dataset_ref.location = LOCATION
-    try:
-        client.get_dataset(dataset_ref)
-        print(f"✅ Dataset exists: {dataset_id}")
-    except Exception:
-        client.create_dataset(dataset_ref)
-        print(f"🆕 Created dataset: {dataset_id}")
+    client.create_dataset(dataset_ref, exists_ok=True, timeout=30)
+    print(f"✅ Dataset ready: {dataset_id}")
 
 def load_csv_to_raw(client: bigquery.Client) -> str:
     table_id = f"{PROJECT_ID}.{DATASET_ID}.incidents_raw"
 
-    # Read CSV with pandas to ensure correct column names and quoting handling
-    print("📥 Reading CSV with pandas ...")
-    df = pd.read_csv(
-        CSV_PATH,
-        dtype=str,
-        keep_default_na=False,
-        engine='python'
-    )
+    # Only the header is read locally; BigQuery parses the rows in the load job
+    with open(CSV_PATH, newline='', encoding='utf-8-sig') as f:
+        header = next(csv.reader(f), [])
 
-    # Ensure expected columns exist and in order
-    missing = [c for c in EXPECTED_COLUMNS if c not in df.columns]
+    # Ensure expected columns exist. CSV loads are positional, so the raw schema follows
+    # the header order; TABLE_SQL selects columns by name.
+    missing = [c for c in EXPECTED_COLUMNS if c not in header]
     if missing:
         raise RuntimeError(f"CSV missing expected columns: {missing}")
-    df = df[EXPECTED_COLUMNS]
 
-    # Upload dataframe, truncate if table exists
+    # Load the file as-is, truncate if table exists
     job_config = bigquery.LoadJobConfig(
+        source_format=bigquery.SourceFormat.CSV,
+        skip_leading_rows=1,
+        autodetect=False,
+        schema=[bigquery.SchemaField(c, 'STRING') for c in header],
+        allow_quoted_newlines=True,
         write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
     )
-    print(f"📤 Loading DataFrame to {table_id} ...")
-    load_job = client.load_table_from_dataframe(df, table_id, job_config=job_config)
+    print(f"📤 Loading {CSV_PATH} to {table_id} ...")
+    with open(CSV_PATH, 'rb') as f:
+        load_job = client.load_table_from_file(f, table_id, job_config=job_config)
     load_job.result()
     table = client.get_table(table_id)
     print(f"✅ Loaded {table.num_rows} rows into {table_id}")
     return table_id
 
 TABLE_SQL = f"""
-CREATE OR REPLACE TABLE `{PROJECT_ID}.{DATASET_ID}.incidents` AS
+CREATE OR REPLACE TABLE `{PROJECT_ID}.{DATASET_ID}.incidents`
+PARTITION BY DATE(created_at)
+CLUSTER BY severity, status, risk_category AS
 SELECT
   SAFE_CAST(incident_id AS STRING) AS incident_id,
   SAFE_CAST(title AS STRING) AS title,
@@ -77,12 +76,20 @@ SELECT
   SAFE_CAST(resolution AS STRING) AS resolution,
   SAFE_CAST(resolution_time_hours AS FLOAT64) AS resolution_time_hours,
   SAFE_CAST(affected_users AS INT64) AS affected_users,
-  -- Parse semicolon-delimited lists into arrays, trim whitespace
-  ARRAY(SELECT TRIM(part) FROM UNNEST(SPLIT(IFNULL(affected_systems, ''), ';')) AS part WHERE TRIM(part) != '') AS affected_systems,
-  ARRAY(SELECT TRIM(part) FROM UNNEST(SPLIT(IFNULL(tags, ''), ';')) AS part WHERE TRIM(part) != '') AS tags,
-  ARRAY(SELECT TRIM(part) FROM UNNEST(SPLIT(IFNULL(artifacts, ''), ';')) AS part WHERE TRIM(part) != '') AS artifacts,
+  -- Parse semicolon-delimited lists into arrays, trimming each element once
+  ARRAY(SELECT item FROM (SELECT TRIM(part) AS item FROM UNNEST(SPLIT(IFNULL(affected_systems, ''), ';')) AS part) WHERE item != '') AS affected_systems,
+  ARRAY(SELECT item FROM (SELECT TRIM(part) AS item FROM UNNEST(SPLIT(IFNULL(tags, ''), ';')) AS part) WHERE item != '') AS tags,
+  ARRAY(SELECT item FROM (SELECT TRIM(part) AS item FROM UNNEST(SPLIT(IFNULL(artifacts, ''), ';')) AS part) WHERE item != '') AS artifacts,
   SAFE_CAST(business_impact AS STRING) AS business_impact,
   SAFE_CAST(risk_score AS FLOAT64) AS risk_score,
+  -- Stored risk bucket, as maintained by sql/incident_risk_category.sql
+  CASE
+    WHEN SAFE_CAST(risk_score AS FLOAT64) >= 0.8 THEN 'Critical (0.8-1.0)'
+    WHEN SAFE_CAST(risk_score AS FLOAT64) >= 0.6 THEN 'High (0.6-0.79)'
+    WHEN SAFE_CAST(risk_score AS FLOAT64) >= 0.4 THEN 'Medium (0.4-0.59)'
+    WHEN SAFE_CAST(risk_score AS FLOAT64) >= 0.2 THEN 'Low (0.2-0.39)'
+    ELSE 'Minimal (0.0-0.19)'
+  END AS risk_category,
   SAFE_CAST(created_by AS STRING) AS created_by,
   SAFE_CAST(last_modified_by AS STRING) AS last_modified_by
 FROM `{PROJECT_ID}.{DATASET_ID}.incidents_raw`;
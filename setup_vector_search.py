@@ -7,7 +7,9 @@ Set up vector search assets:
 - Create policy embeddings in si2a_feat.policy_embed
 - Create vector indexes with index_row_id
 """
+import csv
 import os
+from functools import lru_cache
 from pathlib import Path
 from google.cloud import bigquery
 import google.auth
@@ -28,39 +30,32 @@ REMOTE_MODEL_NAME = f"{PROJECT_ID}.{FEAT_DATASET}.textembed_model"
 def ensure_dataset(client: bigquery.Client, dataset_id: str) -> None:
     ds_ref = bigquery.Dataset(f"{client.project}.{dataset_id}")
     ds_ref.location = LOCATION
-    try:
-        client.get_dataset(ds_ref)
-        print(f"✅ Dataset exists: {dataset_id}")
-    except Exception:
-        client.create_dataset(ds_ref)
-        print(f"🆕 Created dataset: {dataset_id}")
+    client.create_dataset(ds_ref, exists_ok=True, timeout=30)
+    print(f"✅ Dataset ready: {dataset_id}")
 
 
 def load_policy_sections(client: bigquery.Client) -> None:
     table_id = f"{PROJECT_ID}.{DIM_DATASET}.policy_sections"
     print("📥 Loading policy sections CSV ...")
-    # The CSV has unquoted commas in section_text. Parse manually:
-    rows = []
-    with open(POLICY_CSV, 'r', encoding='utf-8') as f:
-        header = f.readline()
-        for line in f:
-            parts = [p.strip() for p in line.rstrip('\n').split(',')]
-            if len(parts) < 3:
-                continue
-            section_id = parts[0]
-            section_title = parts[2]
-            # section_text spans from index 3 up to the token that looks like section_number (e.g., 1.1)
-            # Find the first token matching \d+(\.\d+)? and treat everything before it (from idx 3) as section_text
-            idx = 3
-            while idx < len(parts) and not __import__('re').match(r"^\d+(?:\.\d+)?$", parts[idx] or ''):
-                idx += 1
-            section_text = ','.join(parts[3:idx]).strip()
-            if not section_text:
-                # Fallback: join everything from 3 to end if pattern not found
-                section_text = ','.join(parts[3:]).strip()
-            rows.append({'section_id': section_id, 'section_title': section_title, 'section_text': section_text})
-    df = pd.DataFrame(rows, columns=['section_id', 'section_title', 'section_text'])
-    job_config = bigquery.LoadJobConfig(write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE)
+    # The CSV has unquoted commas in section_text, so read whole lines with the C parser
+    # and split them with vectorized regexes instead of a per-line Python loop.
+    lines = pd.read_csv(POLICY_CSV, sep='\x01', header=0, names=['line'], engine='c',
+                        quoting=csv.QUOTE_NONE, dtype=str, na_filter=False)['line']
+    lines = lines.str.strip().str.replace(r'\s*,\s*', ',', regex=True)
+    df = lines.str.extract(r'^(?P<section_id>[^,]*),[^,]*,(?P<section_title>[^,]*)(?:,(?P<rest>.*))?$')
+    df = df.dropna(subset=['section_title']).fillna({'rest': ''})
+    # section_text runs up to the first token that looks like a section_number (e.g., 1.1);
+    # fall back to everything after the title if that leaves nothing
+    text = df['rest'].str.replace(r'(?:^|,)\d+(?:\.\d+)?(?:,.*)?$', '', regex=True)
+    df['section_text'] = text.where(text != '', df['rest'])
+    df = df[['section_id', 'section_title', 'section_text']].reset_index(drop=True)
+    # All columns are strings: an explicit schema skips dtype detection, and CSV
+    # serialization is lighter than the default Parquet path for string-only frames
+    job_config = bigquery.LoadJobConfig(
+        schema=[bigquery.SchemaField(c, 'STRING') for c in df.columns],
+        source_format=bigquery.SourceFormat.CSV,
+        write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
+    )
     load = client.load_table_from_dataframe(df, table_id, job_config=job_config)
     load.result()
     print(f"✅ Policy sections loaded into {table_id}")
@@ -89,11 +84,17 @@ def build_embeddings_and_indexes(client: bigquery.Client) -> None:
     print("🧠 Creating incident embeddings ...")
     run_query(client, f"""
     CREATE OR REPLACE TABLE `{PROJECT_ID}.{FEAT_DATASET}.incident_text_embed` AS
+    WITH corpus AS (
+      SELECT 
+        i.incident_id,
+        CONCAT(COALESCE(i.title,''), '\\n', COALESCE(i.description,''), '\\n', COALESCE(i.category,''), '\\n', COALESCE(i.root_cause,'')) AS text_corpus
+      FROM `{PROJECT_ID}.si2a_gold.incidents` i
+    )
     SELECT 
-      i.incident_id,
-      CONCAT(COALESCE(i.title,''), '\\n', COALESCE(i.description,''), '\\n', COALESCE(i.category,''), '\\n', COALESCE(i.root_cause,'')) AS text_corpus,
-      ML.GENERATE_EMBEDDING(MODEL `{REMOTE_MODEL_NAME}`, CONCAT(COALESCE(i.title,''), '\\n', COALESCE(i.description,''), '\\n', COALESCE(i.category,''), '\\n', COALESCE(i.root_cause,''))) AS embedding
-    FROM `{PROJECT_ID}.si2a_gold.incidents` i;
+      c.incident_id,
+      c.text_corpus,
+      ML.GENERATE_EMBEDDING(MODEL `{REMOTE_MODEL_NAME}`, c.text_corpus) AS embedding
+    FROM corpus c;
     """)
 
     # Policy embedding table
@@ -123,18 +124,23 @@ def build_embeddings_and_indexes(client: bigquery.Client) -> None:
     """)
 
 
-def make_client() -> bigquery.Client:
+@lru_cache(maxsize=1)
+def _load_creds():
+    """Load credentials once per process; returns (credentials, project) or (None, None) for ADC."""
     scopes = ["https://www.googleapis.com/auth/cloud-platform"]
     adc_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
-    creds = None
     if adc_path and os.path.exists(adc_path):
-        creds, _ = load_credentials_from_file(adc_path, scopes=scopes)
-    else:
-        # Windows gcloud ADC default location
-        appdata = os.getenv('APPDATA') or ''
-        fallback = os.path.join(appdata, 'gcloud', 'application_default_credentials.json')
-        if os.path.exists(fallback):
-            creds, _ = load_credentials_from_file(fallback, scopes=scopes)
+        return load_credentials_from_file(adc_path, scopes=scopes)
+    # Windows gcloud ADC default location
+    appdata = os.getenv('APPDATA') or ''
+    fallback = os.path.join(appdata, 'gcloud', 'application_default_credentials.json')
+    if os.path.exists(fallback):
+        return load_credentials_from_file(fallback, scopes=scopes)
+    return None, None
+
+
+def make_client() -> bigquery.Client:
+    creds, _ = _load_creds()
     return bigquery.Client(project=PROJECT_ID, credentials=creds)
 
 if __name__ == '__main__':
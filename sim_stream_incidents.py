@@ -7,160 +7,204 @@ Hybrid streaming generator (Option C)
 
 Usage:
   PROJECT_ID=your-project BIGQUERY_LOCATION=US python sim_stream_incidents.py --batch-size 5 --interval 10 --iterations 3
+
+Batches are appended with a Parquet load job; pass --use-streaming to send small
+batches through the streaming insert API instead (load jobs are capped at 1500/day per table).
 """
+import itertools
+import json
 import os
-import random
-import string
+import secrets
 import time
-from datetime import datetime, timedelta
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
 import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 import pandas as pd
 from google.cloud import bigquery
+from google.cloud import bigquery_storage
+
+from bq_client import get_client
+from bq_tables import INCIDENTS_SCHEMA, load_dataframe, risk_categories
 
 
 PROJECT_ID = os.getenv("PROJECT_ID", "qwiklabs-gcp-01-786e02d76fb0")
 LOCATION = os.getenv("BIGQUERY_LOCATION", "US")
 DATASET = os.getenv("DATASET", "si2a_gold")
 TABLE = f"{PROJECT_ID}.{DATASET}.incidents"
-
-
-def random_id() -> str:
+_ID_SEQ = itertools.count()
+# Rows per streaming insert request
+INSERT_CHUNK = 10_000
+
+# Severity transition weights (row: seed severity, column: new severity), indexed via SEV_IDX
+SEV_ORDER = np.array(["low", "medium", "high", "critical"])
+SEV_IDX = {sev: i for i, sev in enumerate(SEV_ORDER)}
+WEIGHTS = np.array([
+    [0.7, 0.2, 0.1, 0.0],
+    [0.2, 0.5, 0.25, 0.05],
+    [0.05, 0.25, 0.5, 0.2],
+    [0.0, 0.1, 0.3, 0.6],
+])
+CUM_WEIGHTS = np.cumsum(WEIGHTS, axis=1)
+# Resolution time range in hours per severity
+SEV_HOURS = np.array([[0.5, 2], [1, 6], [2, 12], [4, 24]])
+ASSIGNEES = (
+    "security-analyst-1",
+    "security-analyst-2",
+    "security-analyst-3",
+    "incident-responder-1",
+)
+
+_BQSTORAGE = None
+
+
+def get_bqstorage_client() -> bigquery_storage.BigQueryReadClient:
+    """Return the shared Storage Read API client, creating it on first use."""
+    global _BQSTORAGE
+    if _BQSTORAGE is None:
+        _BQSTORAGE = bigquery_storage.BigQueryReadClient()
+    return _BQSTORAGE
+
+
+def random_ids(n: int) -> List[str]:
+    # One timestamp and random token per batch; the process-wide sequence keeps IDs unique
     ts = datetime.utcnow().strftime("%Y%m%d%H%M%S")
-    suffix = ''.join(random.choices(string.ascii_uppercase + string.digits, k=4))
-    return f"INC-{ts}-{suffix}"
-
+    suffix = secrets.token_hex(2).upper()
+    return [f"INC-{ts}-{suffix}-{next(_ID_SEQ):05d}" for _ in range(n)]
 
-def clamp(x: float, lo: float = 0.0, hi: float = 1.0) -> float:
-    return max(lo, min(hi, x))
 
-
-def choose_severity(seed: str) -> str:
-    sev_order = ["low", "medium", "high", "critical"]
-    weights = {
-        "low": [0.7, 0.2, 0.1, 0.0],
-        "medium": [0.2, 0.5, 0.25, 0.05],
-        "high": [0.05, 0.25, 0.5, 0.2],
-        "critical": [0.0, 0.1, 0.3, 0.6],
-    }
-    seed = (seed or "medium").lower()
-    probs = weights.get(seed, [0.2, 0.5, 0.25, 0.05])
-    return random.choices(sev_order, probs, k=1)[0]
-
-
-def mutate_row(row: Dict[str, Any]) -> Dict[str, Any]:
-    mutated = dict(row)
+def mutate_batch(seeds: List[Dict[str, Any]], n: int, rng: Optional[np.random.Generator] = None) -> pd.DataFrame:
+    """Draw n seed rows and mutate them column-wise with one NumPy draw per field."""
+    rng = rng or np.random.default_rng()
+    base = pd.DataFrame(seeds)
+    mutated = base.iloc[rng.integers(0, len(base), size=n)].reset_index(drop=True)
 
     # New identity
-    mutated["incident_id"] = random_id()
+    mutated["incident_id"] = random_ids(n)
 
     # Time: within last 72 hours
-    now = datetime.utcnow()
-    delta_minutes = random.randint(5, 72 * 60)
-    created = now - timedelta(minutes=delta_minutes)
-    mutated["created_at"] = created.isoformat()
-
-    # Severity and risk
-    base_sev = str(row.get("severity") or "medium")
-    new_sev = choose_severity(base_sev)
-    mutated["severity"] = new_sev
-
-    base_risk = row.get("risk_score")
-    try:
-        base_risk = float(base_risk) if base_risk is not None else 0.5
-    except Exception:
-        base_risk = 0.5
-    jitter = random.uniform(-0.15, 0.15)
-    mutated["risk_score"] = round(clamp(base_risk + jitter), 2)
+    delta_minutes = rng.integers(5, 72 * 60, size=n, endpoint=True)
+    mutated["created_at"] = pd.Timestamp.now(tz="UTC") - pd.to_timedelta(delta_minutes, unit="m")
+
+    # Severity: sample each row from its seed severity's cumulative weights
+    base_sev = mutated["severity"].fillna("medium").astype(str).str.lower().map(SEV_IDX).fillna(1).astype(int).to_numpy()
+    new_sev = np.minimum((rng.random(n)[:, None] >= CUM_WEIGHTS[base_sev]).sum(axis=1), len(SEV_ORDER) - 1)
+    mutated["severity"] = SEV_ORDER[new_sev]
+
+    # Risk
+    base_risk = pd.to_numeric(mutated["risk_score"], errors="coerce").fillna(0.5).to_numpy()
+    mutated["risk_score"] = np.round(np.clip(base_risk + rng.uniform(-0.15, 0.15, size=n), 0.0, 1.0), 2)
+    mutated["risk_category"] = risk_categories(mutated["risk_score"])
 
     # Users
-    au = row.get("affected_users") or 1
-    try:
-        au = int(au)
-    except Exception:
-        au = 1
-    mutated["affected_users"] = max(1, int(au + random.randint(-1, 5)))
+    au = pd.to_numeric(mutated["affected_users"], errors="coerce").fillna(1).replace(0, 1).astype(int).to_numpy()
+    mutated["affected_users"] = np.maximum(1, au + rng.integers(-1, 5, size=n, endpoint=True))
 
     # Status progression
-    mutated["status"] = random.choice(["investigating", "in-progress", "resolved"]) if new_sev != "low" else random.choice(["resolved", "investigating"]) 
+    mutated["status"] = np.where(
+        new_sev == 0,
+        rng.choice(["resolved", "investigating"], size=n),
+        rng.choice(["investigating", "in-progress", "resolved"], size=n),
+    )
 
     # Assigned_to rotation
-    assignees = [
-        "security-analyst-1",
-        "security-analyst-2",
-        "security-analyst-3",
-        "incident-responder-1",
-    ]
-    mutated["assigned_to"] = random.choice(assignees)
+    mutated["assigned_to"] = rng.choice(ASSIGNEES, size=n)
 
     # Resolution time approx by severity
-    sev_to_hours = {"low": (0.5, 2), "medium": (1, 6), "high": (2, 12), "critical": (4, 24)}
-    lo, hi = sev_to_hours.get(new_sev, (1, 6))
-    mutated["resolution_time_hours"] = round(random.uniform(lo, hi), 1)
+    mutated["resolution_time_hours"] = np.round(rng.uniform(SEV_HOURS[new_sev, 0], SEV_HOURS[new_sev, 1]), 1)
 
     # Title suffix to avoid exact duplicates
-    mutated["title"] = f"{row.get('title','Incident')} (sim)"
+    mutated["title"] = mutated["title"].fillna("Incident").astype(str) + " (sim)"
 
     return mutated
 
 
-def fetch_seed(client: bigquery.Client, limit: int = 20) -> List[Dict[str, Any]]:
-    sql = f"""
-    SELECT 
+SEED_COLUMNS = """
       incident_id, title, description, severity, status, created_at, assigned_to, category,
       root_cause, resolution, resolution_time_hours, affected_users, affected_systems, tags,
-      business_impact, risk_score
+      business_impact, risk_score"""
+
+
+def fetch_seed(client: bigquery.Client, limit: int = 20) -> List[Dict[str, Any]]:
+    # Sample recent rows instead of sorting the whole table; when the sample is empty
+    # (small table, or no incidents in the last week) fall back to the newest rows
+    sample_sql = f"""
+    SELECT {SEED_COLUMNS}
+    FROM `{TABLE}` TABLESAMPLE SYSTEM (1 PERCENT)
+    WHERE created_at > TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 7 DAY)
+    LIMIT {limit}
+    """
+    newest_sql = f"""
+    SELECT {SEED_COLUMNS}
     FROM `{TABLE}`
     ORDER BY created_at DESC
     LIMIT {limit}
     """
-    df = client.query(sql).to_dataframe()
+    # BigQuery never caches TABLESAMPLE or CURRENT_TIMESTAMP() results, so only the
+    # deterministic fallback asks for the query cache; rows come back over the Storage Read API
+    attempts = [(sample_sql, None), (newest_sql, bigquery.QueryJobConfig(use_query_cache=True))]
+    for sql, job_config in attempts:
+        df = client.query(sql, job_config=job_config).to_dataframe(bqstorage_client=get_bqstorage_client())
+        if not df.empty:
+            break
     return df.to_dict("records")
 
 
-def insert_rows(client: bigquery.Client, rows: List[Dict[str, Any]]):
-    def sanitize(v):
-        if isinstance(v, np.generic):
-            return v.item()
-        if isinstance(v, (np.ndarray,)):
-            return [sanitize(x) for x in v.tolist()]
-        if isinstance(v, list):
-            return [sanitize(x) for x in v]
-        if isinstance(v, dict):
-            return {k: sanitize(val) for k, val in v.items()}
-        return v
-
-    sanitized = []
-    for r in rows:
-        s = {k: sanitize(v) for k, v in r.items()}
-        # Ensure timestamp string with Z
-        if isinstance(s.get("created_at"), str) and not s["created_at"].endswith("Z"):
-            s["created_at"] = s["created_at"].split(".")[0] + "Z"
-        sanitized.append(s)
-
-    table = client.get_table(TABLE)
-    errors = client.insert_rows_json(table, sanitized)
+def insert_rows(client: bigquery.Client, df: pd.DataFrame, use_streaming: bool = False):
+    if use_streaming:
+        stream_rows(client, df)
+        return
+
+    # One Parquet load job per batch instead of a streaming request per row set
+    load_dataframe(client, df, TABLE, INCIDENTS_SCHEMA)
+
+
+def stream_rows(client: bigquery.Client, df: pd.DataFrame):
+    # pandas' JSON writer unwraps numpy scalars and arrays and turns NaN into null in one pass
+    df = df.assign(created_at=df["created_at"].dt.strftime("%Y-%m-%dT%H:%M:%SZ"))
+    sanitized = json.loads(df.to_json(orient="records"))
+
+    # insert_rows_json accepts the table ID, so no tables.get round trip per batch.
+    # Large batches go out INSERT_CHUNK rows per request; incident IDs double as
+    # insert IDs so a retried request is deduplicated.
+    errors = []
+    for start in range(0, len(sanitized), INSERT_CHUNK):
+        chunk = sanitized[start:start + INSERT_CHUNK]
+        errors += client.insert_rows_json(
+            TABLE,
+            chunk,
+            row_ids=[r["incident_id"] for r in chunk],
+            ignore_unknown_values=True,
+        )
     if errors:
         raise RuntimeError(f"Errors inserting rows: {errors}")
 
 
-def main(batch_size: int, interval_s: int, iterations: int):
-    client = bigquery.Client(project=PROJECT_ID)
+def wait_insert(it: int, rows: int, future: Future):
+    future.result()
+    print(f"✅ Iter {it+1}: inserted {rows} rows")
+
+
+def main(batch_size: int, interval_s: int, iterations: int, use_streaming: bool = False):
+    client = get_client(PROJECT_ID)
     print(f"🔗 Streaming to: {TABLE}")
     seeds = fetch_seed(client)
     if not seeds:
         raise SystemExit("No seed incidents found. Load seeds first.")
 
-    for it in range(iterations):
-        batch: List[Dict[str, Any]] = []
-        for _ in range(batch_size):
-            base = random.choice(seeds)
-            batch.append(mutate_row(base))
-        insert_rows(client, batch)
-        print(f"✅ Iter {it+1}: inserted {len(batch)} rows")
-        if it < iterations - 1:
-            time.sleep(interval_s)
+    # Pipeline ahead: the next batch is generated while the previous insert is in flight
+    pending = None
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        for it in range(iterations):
+            batch = mutate_batch(seeds, batch_size)
+            if pending is not None:
+                wait_insert(*pending)
+            pending = (it, len(batch), pool.submit(insert_rows, client, batch, use_streaming))
+            if it < iterations - 1:
+                time.sleep(interval_s)
+        if pending is not None:
+            wait_insert(*pending)
 
 
 if __name__ == "__main__":
@@ -169,7 +213,8 @@ if __name__ == "__main__":
     p.add_argument("--batch-size", type=int, default=5)
     p.add_argument("--interval", type=int, default=10, help="seconds between batches")
     p.add_argument("--iterations", type=int, default=3)
+    p.add_argument("--use-streaming", action="store_true", help="use streaming inserts instead of load jobs")
     args = p.parse_args()
-    main(args.batch_size, args.interval, args.iterations)
+    main(args.batch_size, args.interval, args.iterations, args.use_streaming)
 
 
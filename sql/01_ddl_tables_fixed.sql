@@ -98,9 +98,13 @@ CREATE OR REPLACE TABLE `${PROJECT_ID}.si2a_gold.incidents` (
   tags ARRAY<STRING>,
   business_impact STRING,
   risk_score FLOAT64,
+  risk_category STRING, -- risk_score bucket, filled in by incident_risk_category.sql
   created_by STRING,
   last_modified_by STRING
-);
+)
+-- Newest-first reads and recent-window filters prune to the latest partitions
+PARTITION BY DATE(created_at)
+CLUSTER BY severity, status, risk_category;
 
 -- Policy sections for compliance checking
 CREATE OR REPLACE TABLE `${PROJECT_ID}.si2a_dim.policy_sections` (
@@ -0,0 +1,22 @@
+-- SI²A: Daily incident snapshot for the dashboard
+-- Rebuilt once a day instead of being maintained continuously like a materialized view;
+-- partitioning and clustering let date/severity filters prune what a view cannot.
+-- Schedule off-peak, e.g.:
+--   bq query --use_legacy_sql=false --schedule="every day 02:00" \
+--     --display_name="si2a incident_daily_snap" < sql/incident_daily_snap.sql
+-- (with ${PROJECT_ID} substituted)
+
+CREATE OR REPLACE TABLE `${PROJECT_ID}.si2a_marts.incident_daily_snap`
+PARTITION BY date
+CLUSTER BY severity AS
+SELECT
+  DATE(created_at) AS date,
+  severity,
+  COUNT(*) AS incident_count,
+  AVG(risk_score) AS avg_risk_score,
+  AVG(resolution_time_hours) AS avg_resolution_time,
+  -- Sum and count behind avg_resolution_time, so rollups across severities stay exact
+  SUM(resolution_time_hours) AS total_resolution_time_hours,
+  COUNT(resolution_time_hours) AS timed_incident_count
+FROM `${PROJECT_ID}.si2a_gold.incidents`
+GROUP BY date, severity;
@@ -0,0 +1,19 @@
+-- SI²A: Stored risk bucket on si2a_gold.incidents
+-- BigQuery has no generated columns, so risk_category is stored and written alongside
+-- risk_score: the loaders and sim_stream_incidents.py compute it (bq_tables.RISK_BUCKETS),
+-- as do seed_incidents.py and setup_bigquery_local_demo.py. This script adds the column to
+-- existing tables and backfills rows written without it (e.g. the 01_ddl sample rows).
+-- Tables created before risk_category joined the clustering keys can be reclustered with:
+--   bq update --clustering_fields=severity,status,risk_category ${PROJECT_ID}:si2a_gold.incidents
+
+ALTER TABLE `${PROJECT_ID}.si2a_gold.incidents` ADD COLUMN IF NOT EXISTS risk_category STRING;
+
+UPDATE `${PROJECT_ID}.si2a_gold.incidents`
+SET risk_category = CASE
+    WHEN risk_score >= 0.8 THEN 'Critical (0.8-1.0)'
+    WHEN risk_score >= 0.6 THEN 'High (0.6-0.79)'
+    WHEN risk_score >= 0.4 THEN 'Medium (0.4-0.59)'
+    WHEN risk_score >= 0.2 THEN 'Low (0.2-0.39)'
+    ELSE 'Minimal (0.0-0.19)'
+  END
+WHERE risk_category IS NULL;
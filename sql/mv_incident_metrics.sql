@@ -0,0 +1,13 @@
+-- SI²A: Per-severity incident metrics for /api/metrics
+-- Materialized so the dashboard reads pre-aggregated rows instead of scanning si2a_gold.incidents
+
+CREATE OR REPLACE MATERIALIZED VIEW `${PROJECT_ID}.si2a_marts.mv_incident_metrics`
+OPTIONS (enable_refresh = true, refresh_interval_minutes = 1440) AS
+SELECT
+  severity,
+  COUNT(*) AS count,
+  AVG(resolution_time_hours) AS avg_resolution_time,
+  AVG(risk_score) AS avg_risk_score,
+  SUM(affected_users) AS total_affected_users
+FROM `${PROJECT_ID}.si2a_gold.incidents`
+GROUP BY severity;
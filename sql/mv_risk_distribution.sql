@@ -0,0 +1,10 @@
+-- SI²A: Incident counts per risk bucket for /api/charts/risk-distribution
+-- Groups by the stored risk_category column, which is computed when incidents are written
+
+CREATE OR REPLACE MATERIALIZED VIEW `${PROJECT_ID}.si2a_marts.mv_risk_distribution`
+OPTIONS (enable_refresh = true, refresh_interval_minutes = 1440) AS
+SELECT
+  risk_category,
+  COUNT(*) AS count
+FROM `${PROJECT_ID}.si2a_gold.incidents`
+GROUP BY risk_category;
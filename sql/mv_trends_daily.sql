@@ -0,0 +1,14 @@
+-- SI²A: Daily incident trend for /api/trends
+
+-- Partitioned like the base table so date-windowed reads prune to the days they need
+
+CREATE OR REPLACE MATERIALIZED VIEW `${PROJECT_ID}.si2a_marts.mv_trends_daily`
+PARTITION BY date
+OPTIONS (enable_refresh = true, refresh_interval_minutes = 1440) AS
+SELECT
+  DATE(created_at) AS date,
+  COUNT(*) AS incident_count,
+  AVG(risk_score) AS avg_risk_score,
+  AVG(resolution_time_hours) AS avg_resolution_time
+FROM `${PROJECT_ID}.si2a_gold.incidents`
+GROUP BY date;
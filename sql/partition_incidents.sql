@@ -0,0 +1,8 @@
+-- SI²A: One-time migration of an existing si2a_gold.incidents table to the partitioned,
+-- clustered layout created by 01_ddl_tables_fixed.sql. Rows are kept as they are.
+-- Run incident_risk_category.sql first so the risk_category clustering column exists.
+
+CREATE OR REPLACE TABLE `${PROJECT_ID}.si2a_gold.incidents`
+PARTITION BY DATE(created_at)
+CLUSTER BY severity, status, risk_category
+AS SELECT * FROM `${PROJECT_ID}.si2a_gold.incidents`;
@@ -3,20 +3,20 @@
 Test script to check BigQuery connection and table existence
 """
 
-from google.cloud import bigquery
 import sys
 
+from bq_client import get_client
+
 def test_bigquery():
     try:
         # Initialize client
-        client = bigquery.Client(project='shadow-it-incident-autopilot')
+        client = get_client('shadow-it-incident-autopilot')
         print("✅ Connected to BigQuery project: shadow-it-incident-autopilot")
         
         # Check if incidents table exists
         try:
-            query = "SELECT COUNT(*) as count FROM `shadow-it-incident-autopilot.si2a_gold.incidents`"
-            result = client.query(query).result()
-            count = result.to_dataframe()['count'].iloc[0]
+            # Row count from table metadata: no query job, no slots, no DataFrame
+            count = client.get_table('shadow-it-incident-autopilot.si2a_gold.incidents').num_rows
             print(f"✅ Found {count} incidents in the table")
             return True
         except Exception as e:
@@ -5,7 +5,13 @@ Test BigQuery and Google Cloud connection status
 
 import os
 import sys
+import shutil
 import subprocess
+import time
+from pathlib import Path
+
+GCLOUD_VERSION_CACHE = Path.home() / ".cache" / "si2a" / "gcloud_version"
+GCLOUD_VERSION_TTL = 24 * 60 * 60
 
 def print_header(title):
     print(f"\n{'='*60}")
@@ -37,23 +43,46 @@ def test_python_packages():
         except ImportError:
             print_status(package, False, f"Missing: {description}")
 
+def gcloud_version(gcloud_path):
+    """Return the first line of `gcloud --version`, cached on disk for GCLOUD_VERSION_TTL seconds."""
+    try:
+        if time.time() - GCLOUD_VERSION_CACHE.stat().st_mtime < GCLOUD_VERSION_TTL:
+            return GCLOUD_VERSION_CACHE.read_text(encoding='utf-8')
+    except OSError:
+        pass
+    
+    result = subprocess.run([gcloud_path, "--version"],
+                          capture_output=True, text=True, timeout=10)
+    if result.returncode != 0:
+        return None
+    version = result.stdout.split('\n')[0]
+    try:
+        GCLOUD_VERSION_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        GCLOUD_VERSION_CACHE.write_text(version, encoding='utf-8')
+    except OSError:
+        pass
+    return version
+
 def test_gcloud_cli():
     """Test if gcloud CLI is available"""
     print_header("Google Cloud CLI Status")
     
+    # gcloud takes seconds to start, so look it up on PATH first and cache its version
+    gcloud_path = shutil.which("gcloud")
+    if gcloud_path is None:
+        print_status("gcloud CLI", False, "Not found in PATH")
+        return False
+    
     try:
-        result = subprocess.run(["gcloud", "--version"], 
-                              capture_output=True, text=True, timeout=10)
-        if result.returncode == 0:
-            version = result.stdout.split('\n')[0]
-            print_status("gcloud CLI", True, version)
-            return True
-        else:
-            print_status("gcloud CLI", False, "Command failed")
-            return False
+        version = gcloud_version(gcloud_path)
     except (FileNotFoundError, subprocess.TimeoutExpired):
         print_status("gcloud CLI", False, "Not found in PATH")
         return False
+    if version is None:
+        print_status("gcloud CLI", False, "Command failed")
+        return False
+    print_status("gcloud CLI", True, version)
+    return True
 
 def test_google_auth():
     """Test Google Cloud authentication"""
@@ -61,13 +90,13 @@ def test_google_auth():
     
     try:
         from google.auth import default
-        from google.cloud import bigquery
+        from bq_client import get_client
         
         credentials, project = default()
         print_status("Authentication", True, f"Project: {project}")
         
         # Test BigQuery connection
-        client = bigquery.Client()
+        client = get_client()
         datasets = list(client.list_datasets(max_results=5))
         print_status("BigQuery Connection", True, f"Found {len(datasets)} datasets")
         return True
@@ -4,133 +4,134 @@ Test BigQuery functions and show working capabilities
 """
 
 import logging
+import os
 from google.cloud import bigquery
 
+from bq_client import get_client
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 PROJECT_ID = "shadow-it-incident-autopilot"
+# Optional reservation so CI probes run on their own slots instead of the on-demand pool
+BQ_RESERVATION = os.getenv("BQ_RESERVATION")
+# Probe inputs never change, so repeated runs are answered from the query cache
+# inline in the jobs.query response
+PROBE_JOB_CONFIG = bigquery.QueryJobConfig(use_query_cache=True)
+
+def print_executive_summary(value):
+    print("\n📋 Executive Summary Generation:")
+    print("=" * 80)
+    print(value)
+    print()
+
+def print_classification(value):
+    print("🏷️ Incident Classification:")
+    print("=" * 80)
+    print(f"Classification: {value}")
+    print()
+
+def print_compliance(value):
+    print("✅ Policy Compliance Check:")
+    print("=" * 80)
+    status = "VIOLATES" if value else "COMPLIES"
+    print(f"Policy Compliance: {status}")
+    print()
+
+def print_risk_assessment(rows):
+    print("⚠️ Risk Assessment:")
+    print("=" * 80)
+    for row in rows:
+        print(f"Risk Level: {row['risk_level']}")
+        print(f"Adjusted Risk Score: {row['adjusted_risk_score']}")
+        print()
+
+def print_root_cause(value):
+    print("🔍 Root Cause Analysis:")
+    print("=" * 80)
+    print(value)
+    print()
+
+def print_communication(value):
+    print("📢 Stakeholder Communication (Executive):")
+    print("=" * 80)
+    print(value)
+    print()
+
+# (log message, failure label, column alias, SQL expression, printer)
+PROBES = [
+    ("📊 Testing Executive Summary Generation...", "Executive summary", "executive_summary",
+     "`si2a_fn_generate_executive_summary`('INC-2024-002')", print_executive_summary),
+    ("🏷️ Testing Incident Classification...", "Classification", "classification",
+     "`si2a_fn_classify_incident`('User downloaded large amount of customer data to personal device')",
+     print_classification),
+    ("✅ Testing Policy Compliance Check...", "Compliance check", "violates",
+     "`si2a_fn_check_policy_compliance`('INC-2024-001', 'SAAS-001')", print_compliance),
+    # Table function: its rows come back as an ARRAY<STRUCT> column
+    ("⚠️ Testing Risk Assessment...", "Risk assessment", "risk_assessment",
+     "ARRAY(SELECT AS STRUCT * FROM `si2a_fn_assess_incident_risk`('INC-2024-002'))", print_risk_assessment),
+    ("🔍 Testing Root Cause Analysis...", "Root cause analysis", "root_cause_analysis",
+     "`si2a_fn_analyze_root_cause`('INC-2024-003')", print_root_cause),
+    ("📢 Testing Stakeholder Communication...", "Communication", "exec_comm",
+     "`si2a_fn_generate_stakeholder_communication`('INC-2024-001', 'executive')", print_communication),
+]
+
+def run_probes_individually(client):
+    """Run each probe as its own job; returns (probe, value, error) in PROBES order.
+
+    All jobs are submitted before any result is awaited, so they run side by side
+    in BigQuery without a local thread per probe. Jobs that fail with a retryable
+    error are resubmitted by the client's default job retry.
+    """
+    jobs = []
+    for probe in PROBES:
+        _, _, alias, expr, _ = probe
+        try:
+            jobs.append((probe, client.query(f"SELECT {expr} AS {alias}", job_config=PROBE_JOB_CONFIG), None))
+        except Exception as e:
+            jobs.append((probe, None, e))
+    values = []
+    for probe, job, error in jobs:
+        value = None
+        if error is None:
+            try:
+                value = next(iter(job.result()))[probe[2]]
+            except Exception as e:
+                error = e
+        values.append((probe, value, error))
+    return values
 
 def test_functions():
     """Test BigQuery functions"""
     logger.info(f"🧪 Testing BigQuery functions in project: {PROJECT_ID}")
-    
+
     try:
-        client = bigquery.Client(project=PROJECT_ID)
-        
-        # Test 1: Executive Summary Generation
-        logger.info("📊 Testing Executive Summary Generation...")
-        query = f"""
-        SELECT `si2a_fn_generate_executive_summary`('INC-2024-002') as executive_summary
-        """
-        
-        try:
-            query_job = client.query(query)
-            results = query_job.result()
-            
-            print("\n📋 Executive Summary Generation:")
-            print("=" * 80)
-            for row in results:
-                print(row.executive_summary)
-                print()
-        except Exception as e:
-            logger.warning(f"⚠️ Executive summary failed: {e}")
-        
-        # Test 2: Incident Classification
-        logger.info("🏷️ Testing Incident Classification...")
-        query = f"""
-        SELECT `si2a_fn_classify_incident`('User downloaded large amount of customer data to personal device') as classification
-        """
-        
-        try:
-            query_job = client.query(query)
-            results = query_job.result()
-            
-            print("🏷️ Incident Classification:")
-            print("=" * 80)
-            for row in results:
-                print(f"Classification: {row.classification}")
-                print()
-        except Exception as e:
-            logger.warning(f"⚠️ Classification failed: {e}")
-        
-        # Test 3: Policy Compliance Check
-        logger.info("✅ Testing Policy Compliance Check...")
-        query = f"""
-        SELECT `si2a_fn_check_policy_compliance`('INC-2024-001', 'SAAS-001') as violates
-        """
-        
-        try:
-            query_job = client.query(query)
-            results = query_job.result()
-            
-            print("✅ Policy Compliance Check:")
-            print("=" * 80)
-            for row in results:
-                status = "VIOLATES" if row.violates else "COMPLIES"
-                print(f"Policy Compliance: {status}")
-                print()
-        except Exception as e:
-            logger.warning(f"⚠️ Compliance check failed: {e}")
-        
-        # Test 4: Risk Assessment
-        logger.info("⚠️ Testing Risk Assessment...")
-        query = f"""
-        SELECT * FROM `si2a_fn_assess_incident_risk`('INC-2024-002')
-        """
-        
-        try:
-            query_job = client.query(query)
-            results = query_job.result()
-            
-            print("⚠️ Risk Assessment:")
-            print("=" * 80)
-            for row in results:
-                print(f"Risk Level: {row.risk_level}")
-                print(f"Adjusted Risk Score: {row.adjusted_risk_score}")
-                print()
-        except Exception as e:
-            logger.warning(f"⚠️ Risk assessment failed: {e}")
-        
-        # Test 5: Root Cause Analysis
-        logger.info("🔍 Testing Root Cause Analysis...")
-        query = f"""
-        SELECT `si2a_fn_analyze_root_cause`('INC-2024-003') as root_cause_analysis
-        """
-        
-        try:
-            query_job = client.query(query)
-            results = query_job.result()
-            
-            print("🔍 Root Cause Analysis:")
-            print("=" * 80)
-            for row in results:
-                print(row.root_cause_analysis)
-                print()
-        except Exception as e:
-            logger.warning(f"⚠️ Root cause analysis failed: {e}")
-        
-        # Test 6: Stakeholder Communication
-        logger.info("📢 Testing Stakeholder Communication...")
-        query = f"""
-        SELECT `si2a_fn_generate_stakeholder_communication`('INC-2024-001', 'executive') as exec_comm
-        """
-        
+        client = get_client(PROJECT_ID, BQ_RESERVATION)
+
+        # All probes run as columns of one SELECT, so a single job is created instead of six
+        query = "SELECT\n" + ",\n".join(f"  {expr} AS {alias}" for _, _, alias, expr, _ in PROBES)
+
         try:
-            query_job = client.query(query)
-            results = query_job.result()
-            
-            print("📢 Stakeholder Communication (Executive):")
-            print("=" * 80)
-            for row in results:
-                print(row.exec_comm)
-                print()
+            row = next(iter(client.query_and_wait(query, job_config=PROBE_JOB_CONFIG)))
+            values = [(probe, row[probe[2]], None) for probe in PROBES]
         except Exception as e:
-            logger.warning(f"⚠️ Communication failed: {e}")
-        
+            # One broken function fails the whole SELECT; re-run the probes one per
+            # job, side by side, to find out which ones work
+            logger.warning(f"⚠️ Combined probe query failed, probing functions individually: {e}")
+            values = run_probes_individually(client)
+
+        for (message, label, _, _, printer), value, error in values:
+            logger.info(message)
+            try:
+                if error is not None:
+                    raise error
+                printer(value)
+            except Exception as e:
+                logger.warning(f"⚠️ {label} failed: {e}")
+
         logger.info("✅ All function tests completed!")
-        
+
     except Exception as e:
         logger.error(f"❌ Test failed: {e}")
 
@@ -1,68 +1,120 @@
 #!/usr/bin/env python3
+# Results stay in Arrow end to end, so this script never imports pandas
+import io
+import os
+from typing import Final
+
 from google.cloud import bigquery
-import pandas as pd
+from google.cloud import bigquery_storage
+from google.cloud import storage
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from bq_client import fetch_arrow, get_client, result_to_arrow
 
 PROJECT_ID = 'shadow-it-incident-autopilot'
 TABLE = f"`{PROJECT_ID}.si2a_gold.incidents`"
+# Optional reservation so CI probes run on their own slots instead of the on-demand pool
+BQ_RESERVATION = os.getenv("BQ_RESERVATION")
+# Trend results at least this large are downloaded over TREND_STREAMS parallel streams
+TREND_PARALLEL_ROWS = 100_000
+TREND_STREAMS = 8
+# Trend queries estimated to scan at least this much are exported to Parquet in
+# STAGING_BUCKET (when set) and read back from GCS
+STAGING_BUCKET = os.getenv("STAGING_BUCKET")
+TREND_EXPORT_BYTES = 1 << 30
+TREND_EXPORT_PREFIX = "trend"
+# Preflight cap: a trend query estimated above this is narrowed to the last TREND_RECENT_DAYS days
+TREND_MAX_BYTES = int(os.getenv("TREND_MAX_BYTES", 10 << 30))
+TREND_RECENT_DAYS = 30
+DRY_RUN_CONFIG = bigquery.QueryJobConfig(dry_run=True, use_query_cache=False)
 
-c = bigquery.Client(project=PROJECT_ID)
+c = get_client(PROJECT_ID, BQ_RESERVATION)
+# Small results come back inline from jobs.query via query_and_wait; bq_client's
+# fetch helpers switch larger ones to the Arrow-based Storage Read API
+bqs = bigquery_storage.BigQueryReadClient()
 print("Connected to BigQuery")
 
 print("/api/incidents -> top 3 rows")
-q_inc = f"""
+Q_INC: Final[str] = f"""
 SELECT incident_id,title,description,severity,status,created_at,assigned_to,category,root_cause,resolution,
        resolution_time_hours,affected_users,affected_systems,tags,business_impact,risk_score
 FROM {TABLE}
 ORDER BY created_at DESC
 LIMIT 3
 """
-df_inc = c.query(q_inc).to_dataframe()
-print(df_inc.dtypes)
-print(df_inc.head(3))
+# maxResults lets jobs.query return all three rows inline in its first response
+rows_inc = c.query_and_wait(Q_INC, max_results=3, job_config=bigquery.QueryJobConfig(use_query_cache=True))
+print([f"{field.name}: {field.field_type}" for field in rows_inc.schema])
+for row in rows_inc:
+    print(dict(row.items()))
 
 print("/api/metrics")
-q_met = f"""
-SELECT severity,
-       COUNT(*) as count,
-       AVG(resolution_time_hours) as avg_resolution_time,
-       AVG(risk_score) as avg_risk_score,
-       SUM(affected_users) as total_affected_users
-FROM {TABLE}
-GROUP BY severity
+Q_MET: Final[str] = f"""
+SELECT severity, count, avg_resolution_time, avg_risk_score, total_affected_users
+FROM `{PROJECT_ID}.si2a_marts.mv_incident_metrics`
 ORDER BY CASE severity WHEN 'critical' THEN 1 WHEN 'high' THEN 2 WHEN 'medium' THEN 3 WHEN 'low' THEN 4 ELSE 5 END
 """
-df_met = c.query(q_met).to_dataframe()
-print(df_met)
-print({
-    'total_incidents': int(df_met['count'].sum()),
-    'avg_mttr': float(df_met['avg_resolution_time'].mean()) if not pd.isna(df_met['avg_resolution_time'].mean()) else 0.0,
-    'avg_risk_score': float(df_met['avg_risk_score'].mean()) if not pd.isna(df_met['avg_risk_score'].mean()) else 0.0,
-})
+print(fetch_arrow(c, Q_MET, bqs))
+# Summary totals are aggregated in BigQuery and come back as a single row
+Q_SUMMARY: Final[str] = f"""
+SELECT
+  COUNT(*) AS total_incidents,
+  IFNULL(AVG(resolution_time_hours), 0.0) AS avg_mttr,
+  IFNULL(AVG(risk_score), 0.0) AS avg_risk_score
+FROM {TABLE}
+"""
+print(dict(next(iter(c.query_and_wait(Q_SUMMARY))).items()))
 
 print("/api/charts/risk-distribution")
-q_risk = f"""
-SELECT CASE 
-         WHEN risk_score >= 0.8 THEN 'Critical (0.8-1.0)'
-         WHEN risk_score >= 0.6 THEN 'High (0.6-0.79)'
-         WHEN risk_score >= 0.4 THEN 'Medium (0.4-0.59)'
-         WHEN risk_score >= 0.2 THEN 'Low (0.2-0.39)'
-         ELSE 'Minimal (0.0-0.19)'
-       END AS risk_category,
-       COUNT(*) as count
-FROM {TABLE}
-GROUP BY risk_category
+Q_RISK: Final[str] = f"""
+SELECT risk_category, count
+FROM `{PROJECT_ID}.si2a_marts.mv_risk_distribution`
 ORDER BY risk_category
 """
-print(c.query(q_risk).to_dataframe())
+print(fetch_arrow(c, Q_RISK, bqs))
 
 print("/api/trends")
-q_trend = f"""
-SELECT DATE(created_at) as date,
-       COUNT(*) as incident_count,
-       AVG(risk_score) as avg_risk_score,
-       AVG(resolution_time_hours) as avg_resolution_time
-FROM {TABLE}
-GROUP BY date
-ORDER BY date
+# No ORDER BY: ordered results are read over a single Storage API stream, so the
+# rows are sorted after download instead
+Q_TREND: Final[str] = f"""
+SELECT date, incident_count, avg_risk_score, avg_resolution_time
+FROM `{PROJECT_ID}.si2a_marts.mv_trends_daily`
 """
-print(c.query(q_trend).to_dataframe().tail(5))
+Q_TREND_RECENT: Final[str] = Q_TREND + f"WHERE date >= DATE_SUB(CURRENT_DATE(), INTERVAL {TREND_RECENT_DAYS} DAY)\n"
+
+def read_trend_via_export(sql):
+    """Write a trend query as Snappy Parquet to the staging bucket with EXPORT DATA and read it back."""
+    bucket = storage.Client(project=PROJECT_ID).bucket(STAGING_BUCKET)
+    # Clear shards from an earlier, larger export so they are not read back
+    for blob in bucket.list_blobs(prefix=f"{TREND_EXPORT_PREFIX}/"):
+        blob.delete()
+    c.query_and_wait(f"""
+    EXPORT DATA OPTIONS (
+      uri = 'gs://{STAGING_BUCKET}/{TREND_EXPORT_PREFIX}/*.parquet',
+      format = 'PARQUET', compression = 'SNAPPY', overwrite = true
+    ) AS {sql}""")
+    shards = [pq.read_table(io.BytesIO(blob.download_as_bytes()))
+              for blob in bucket.list_blobs(prefix=f"{TREND_EXPORT_PREFIX}/")]
+    return pa.concat_tables(shards)
+
+# Dry runs are free and report the bytes the query would scan
+trend_sql = Q_TREND
+trend_estimate = c.query(trend_sql, job_config=DRY_RUN_CONFIG).total_bytes_processed
+if trend_estimate > TREND_MAX_BYTES:
+    print(f"⚠️ Trend query would scan {trend_estimate:,} bytes; reading the last {TREND_RECENT_DAYS} days only")
+    trend_sql = Q_TREND_RECENT
+    trend_estimate = c.query(trend_sql, job_config=DRY_RUN_CONFIG).total_bytes_processed
+if STAGING_BUCKET and trend_estimate >= TREND_EXPORT_BYTES:
+    # Very large results: BigQuery workers write Parquet shards in parallel
+    tbl_trend = read_trend_via_export(trend_sql)
+else:
+    trend_rows = c.query_and_wait(trend_sql)
+    if trend_rows.total_rows >= TREND_PARALLEL_ROWS:
+        # Large results: decode several Arrow streams in parallel
+        batches = trend_rows.to_arrow_iterable(bqstorage_client=bqs, max_stream_count=TREND_STREAMS)
+        tbl_trend = pa.Table.from_batches(list(batches))
+    else:
+        tbl_trend = result_to_arrow(trend_rows, bqs)
+tbl_trend = tbl_trend.sort_by('date')
+print(tbl_trend.slice(max(tbl_trend.num_rows - 5, 0)))
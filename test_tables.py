@@ -4,7 +4,9 @@ Test BigQuery tables and show sample data
 """
 
 import logging
-from google.cloud import bigquery
+from typing import Final
+
+from bq_client import get_client, result_to_arrow
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -12,84 +14,81 @@ logger = logging.getLogger(__name__)
 
 PROJECT_ID = "shadow-it-incident-autopilot"
 
+Q_SAMPLE_INCIDENTS: Final[str] = f"""
+SELECT
+    incident_id,
+    title,
+    severity,
+    status,
+    created_at,
+    affected_users,
+    risk_score
+FROM `{PROJECT_ID}.si2a_gold.incidents`
+ORDER BY created_at DESC
+LIMIT 5
+"""
+
+Q_SAMPLE_POLICY_SECTIONS: Final[str] = f"""
+SELECT
+    section_id,
+    section_title,
+    category,
+    compliance_level
+FROM `{PROJECT_ID}.si2a_dim.policy_sections`
+LIMIT 5
+"""
+
+Q_SAMPLE_DAILY_METRICS: Final[str] = f"""
+SELECT
+    date,
+    SUM(incident_count) AS total_incidents,
+    SUM(IF(severity IN ('critical', 'high'), incident_count, 0)) AS high_severity_incidents,
+    SAFE_DIVIDE(SUM(total_resolution_time_hours), SUM(timed_incident_count)) AS avg_resolution_time_hours
+FROM `{PROJECT_ID}.si2a_marts.incident_daily_snap`
+GROUP BY date
+ORDER BY date DESC
+LIMIT 5
+"""
+
+def print_sample(results):
+    """Print a result set as one table; Arrow buffers are handed to pandas without a copy."""
+    df = result_to_arrow(results).to_pandas(split_blocks=True, self_destruct=True)
+    print(df.to_string(index=False))
+    print()
+
 def test_tables():
     """Test if tables exist and show sample data"""
     logger.info(f"🔍 Testing BigQuery tables in project: {PROJECT_ID}")
     
     try:
-        client = bigquery.Client(project=PROJECT_ID)
+        client = get_client(PROJECT_ID)
         
+        # Submit all three queries before reading any results so they run side by side
+        incidents_job, policy_job, daily_job = [client.query(q) for q in (Q_SAMPLE_INCIDENTS, Q_SAMPLE_POLICY_SECTIONS, Q_SAMPLE_DAILY_METRICS)]
+
         # Test incidents table
         logger.info("📊 Testing incidents table...")
-        query = f"""
-        SELECT 
-            incident_id,
-            title,
-            severity,
-            status,
-            created_at,
-            affected_users,
-            risk_score
-        FROM `{PROJECT_ID}.si2a_gold.incidents`
-        ORDER BY created_at DESC
-        LIMIT 5
-        """
-        
-        query_job = client.query(query)
-        results = query_job.result()
+        results = incidents_job.result()
         
         print("\n📋 Sample Incidents:")
         print("=" * 80)
-        for row in results:
-            print(f"• {row.incident_id}: {row.title}")
-            print(f"  Severity: {row.severity} | Status: {row.status} | Users: {row.affected_users}")
-            print(f"  Risk Score: {row.risk_score} | Created: {row.created_at}")
-            print()
+        print_sample(results)
         
         # Test policy sections table
         logger.info("📋 Testing policy sections table...")
-        query = f"""
-        SELECT 
-            section_id,
-            section_title,
-            category,
-            compliance_level
-        FROM `{PROJECT_ID}.si2a_dim.policy_sections`
-        LIMIT 5
-        """
-        
-        query_job = client.query(query)
-        results = query_job.result()
+        results = policy_job.result()
         
         print("📜 Sample Policy Sections:")
         print("=" * 80)
-        for row in results:
-            print(f"• {row.section_id}: {row.section_title}")
-            print(f"  Category: {row.category} | Compliance: {row.compliance_level}")
-            print()
+        print_sample(results)
         
         # Test daily metrics table
         logger.info("📈 Testing daily metrics table...")
-        query = f"""
-        SELECT 
-            date,
-            total_incidents,
-            high_severity_incidents,
-            avg_resolution_time_hours
-        FROM `{PROJECT_ID}.si2a_marts.incident_daily`
-        ORDER BY date DESC
-        LIMIT 5
-        """
-        
-        query_job = client.query(query)
-        results = query_job.result()
+        results = daily_job.result()
         
         print("📊 Sample Daily Metrics:")
         print("=" * 80)
-        for row in results:
-            print(f"• {row.date}: {row.total_incidents} incidents")
-            print(f"  High Severity: {row.high_severity_incidents} | Avg Resolution: {row.avg_resolution_time_hours:.1f} hours")
-            print()
+        print_sample(results)
         
         logger.info("✅ All tables tested successfully!")
         
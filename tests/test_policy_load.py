@@ -0,0 +1,42 @@
+"""
+Offline check that policy sections survive the CSV -> DataFrame -> Parquet load path.
+"""
+import io
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pyarrow.parquet as pq
+from google.auth.credentials import AnonymousCredentials
+from google.cloud import bigquery
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bq_tables import load_dataframe
+from load_data_simple import POLICY_SPEC, parse_csv
+
+POLICY_CSV = (
+    "section_id,policy_id,section_title,section_text,section_number,category,compliance_level,"
+    "effective_date,expiry_date,owner,status,version\n"
+    "SEC-001,POL-001,Access,Use SSO,1.1,security,mandatory,2024-01-01,2025-01-01,it,active,2.0\n"
+)
+
+def test_policy_section_number_loads_as_string(tmp_path):
+    csv_path = tmp_path / 'policy_sections.csv'
+    csv_path.write_text(POLICY_CSV)
+    df = parse_csv(csv_path, POLICY_SPEC.array_cols, POLICY_SPEC.timestamp_cols,
+                   POLICY_SPEC.date_cols, POLICY_SPEC.string_cols)
+
+    client = bigquery.Client(project='test-project', credentials=AnonymousCredentials())
+    uploaded = {}
+
+    def capture(file_obj, *args, **kwargs):
+        uploaded['parquet'] = file_obj.read()
+        return mock.Mock()
+
+    with mock.patch.object(client, 'load_table_from_file', side_effect=capture):
+        load_dataframe(client, df, POLICY_SPEC.table_id, POLICY_SPEC.schema)
+
+    table = pq.read_table(io.BytesIO(uploaded['parquet']))
+    assert table.column('section_number').to_pylist() == ['1.1']
+    assert table.column('version').to_pylist() == ['2.0']